@@ -29,13 +29,15 @@ fi
 echo "Verificando dependencias..."
 python3 -c "
 import sys
-try:
-    import geopandas, shapely, pyproj, gpxpy, pandas, openpyxl
-    print('✓ Todas las dependencias están instaladas')
-except ImportError as e:
-    print(f'✗ Dependencia faltante: {e}')
+from importlib.util import find_spec
+# find_spec solo localiza los módulos: no carga GEOS ni PROJ antes de abrir la app
+missing = [name for name in ('geopandas', 'shapely', 'pyproj', 'pandas', 'openpyxl')
+           if find_spec(name) is None]
+if missing:
+    print('✗ Dependencia faltante:', ', '.join(missing))
     print('Ejecute: pip install -r requirements.txt')
     sys.exit(1)
+print('✓ Todas las dependencias están instaladas')
 "
 
 if [ $? -ne 0 ]; then
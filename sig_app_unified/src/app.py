@@ -5,6 +5,7 @@ Punto de entrada principal de la aplicación SIG unificada.
 
 import sys
 import os
+import importlib.util
 import tkinter as tk
 from tkinter import messagebox
 
@@ -19,6 +20,9 @@ except ImportError as e:
     print("Asegúrese de que todas las dependencias estén instaladas")
     sys.exit(1)
 
+# Dependencias críticas verificadas al inicio (sin importarlas)
+REQUIRED_DEPENDENCIES = ("geopandas", "shapely", "pyproj", "pandas", "openpyxl")
+
 def main():
     """Función principal de la aplicación."""
     try:
@@ -26,18 +30,14 @@ def main():
         root = tk.Tk()
         root.withdraw()  # Ocultar ventana temporal
         
-        # Verificar dependencias críticas
-        try:
-            import geopandas
-            import shapely
-            import pyproj
-            import gpxpy
-            import pandas
-            import openpyxl
-        except ImportError as e:
-            error_msg = f"Dependencia faltante: {e}\n\nPor favor instale las dependencias requeridas:\npip install geopandas shapely pyproj gpxpy pandas openpyxl"
+        # Verificar dependencias críticas (find_spec no ejecuta el módulo)
+        missing = [name for name in REQUIRED_DEPENDENCIES
+                   if importlib.util.find_spec(name) is None]
+        if missing:
+            missing_names = ", ".join(missing)
+            error_msg = f"Dependencia faltante: {missing_names}\n\nPor favor instale las dependencias requeridas:\npip install {' '.join(REQUIRED_DEPENDENCIES)}"
             messagebox.showerror("Error de Dependencias", error_msg)
-            logger.error(f"Dependencia faltante: {e}")
+            logger.error(f"Dependencia faltante: {missing_names}")
             return
         
         root.destroy()  # Destruir ventana temporal
@@ -51,7 +51,8 @@ def main():
         logger.error(f"Error fatal en la aplicación: {e}")
         try:
             messagebox.showerror("Error Fatal", f"Error iniciando la aplicación:\n\n{e}")
-        except:
+        except tk.TclError:
+            # Sin pantalla disponible para mostrar el diálogo
             print(f"Error fatal: {e}")
         sys.exit(1)
 
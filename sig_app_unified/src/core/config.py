@@ -5,7 +5,10 @@ Define constantes, estilos y configuraciones compartidas.
 """
 
 import os
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # Configuración de directorios
@@ -14,9 +17,15 @@ DATA_DIR = PROJECT_ROOT / "data"
 TEMP_DIR = PROJECT_ROOT / "temp"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
-# Crear directorios si no existen
-for directory in [DATA_DIR, TEMP_DIR, LOGS_DIR]:
-    directory.mkdir(exist_ok=True)
+def ensure_directories(*directories: Path) -> None:
+    """Crea los directorios indicados que aún no existan."""
+    # is_dir() resuelve el caso común (ya existe) con un solo stat()
+    for directory in directories:
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
+
+# Los directorios se crean al usarse (ensure_directories), no al importar:
+# al arrancar solo hace falta el de logs, y solo al configurar el logging
 
 # Configuración de colores y estilo (tema naranja)
 UI_COLORS = {
@@ -49,8 +58,16 @@ DEFAULT_CRS = {
     "utm_auto": "auto"              # Auto-detectar zona UTM
 }
 
+# CRS seleccionables en la interfaz, por etiqueta (compartido por las páginas)
+CRS_CHOICES = {
+    "UTM 19S (Chile)": DEFAULT_CRS["utm_chile"],
+    "WGS84 (Geográficas)": DEFAULT_CRS["geographic"],
+    "Auto-detectar zona UTM": DEFAULT_CRS["utm_auto"],
+}
+
 # Configuración de logging
 LOGGING_CONFIG = {
+    "name": "sig_app",
     "level": logging.INFO,
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     "file": LOGS_DIR / "sig_app.log"
@@ -93,16 +110,37 @@ MESSAGES = {
 }
 
 def setup_logging():
-    """Configura el sistema de logging de la aplicación."""
-    logging.basicConfig(
-        level=LOGGING_CONFIG["level"],
-        format=LOGGING_CONFIG["format"],
-        handlers=[
+    """
+    Configura el sistema de logging de la aplicación.
+    
+    Los registros se encolan con un QueueHandler y un QueueListener en
+    segundo plano los escribe a archivo y consola, de modo que los hilos
+    de trabajo nunca esperan la escritura a disco.
+    """
+    root_logger = logging.getLogger()
+    
+    # Igual que basicConfig: no reconfigurar si ya hay handlers
+    if not root_logger.handlers:
+        ensure_directories(LOGS_DIR)
+        formatter = logging.Formatter(LOGGING_CONFIG["format"])
+        handlers = [
             logging.FileHandler(LOGGING_CONFIG["file"]),
             logging.StreamHandler()
         ]
-    )
-    return logging.getLogger(__name__)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        
+        root_logger.setLevel(LOGGING_CONFIG["level"])
+        root_logger.addHandler(QueueHandler(log_queue))
+        listener.start()
+        atexit.register(listener.stop)
+    
+    # Nombre fijo: este módulo se importa como src.core.config y como
+    # core.config según el punto de entrada, y ambos deben usar el mismo logger
+    return logging.getLogger(LOGGING_CONFIG["name"])
 
 # Logger global
 logger = setup_logging()
@@ -4,35 +4,268 @@ Procesador para archivos GPX - conversión a KMZ.
 """
 
 import os
-import tempfile
-from typing import List, Dict, Any
-import gpxpy
-import simplekml
+import weakref
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+import numpy as np
+
+# lxml (libxml2) es más rápido que ElementTree; se usa si está instalado
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
 
 from .config import logger
-from .utils import create_kmz_from_kml
+from .kml_writer import KMLWriter, KML_COLORS
+from .utils import write_kmz, clean_temp_dirs
 from .validators import ValidationError
 
+# Elementos de primer nivel que se leen del GPX; '{*}' acepta GPX 1.0 y 1.1
+GPX_ITEM_TAGS = ("{*}trk", "{*}rte", "{*}wpt")
+
+# Radio terrestre (m) usado por gpxpy, para que las distancias coincidan
+EARTH_RADIUS = 6378.137 * 1000
+
+class GPXTrack:
+    """Track leído del GPX: cada segmento es un arreglo (N, 3) de lon, lat y elevación."""
+    
+    __slots__ = ("name", "description", "segments")
+    
+    def __init__(self, name: Optional[str], description: Optional[str], segments: List[np.ndarray]):
+        self.name = name
+        self.description = description
+        self.segments = segments
+
+class GPXRoute:
+    """Ruta leída del GPX: points es un arreglo (N, 3) de lon, lat y elevación."""
+    
+    __slots__ = ("name", "description", "points")
+    
+    def __init__(self, name: Optional[str], description: Optional[str], points: np.ndarray):
+        self.name = name
+        self.description = description
+        self.points = points
+
+class GPXWaypoint:
+    """Waypoint leído del GPX (elevación None si no existe, tiempo como texto ISO 8601)."""
+    
+    __slots__ = ("name", "description", "comment", "time", "longitude", "latitude", "elevation")
+    
+    def __init__(self, name, description, comment, time, longitude, latitude, elevation):
+        self.name = name
+        self.description = description
+        self.comment = comment
+        self.time = time
+        self.longitude = longitude
+        self.latitude = latitude
+        self.elevation = elevation
+
+class GPXData:
+    """Contenido de un GPX: tracks, rutas y waypoints."""
+    
+    __slots__ = ("tracks", "routes", "waypoints")
+    
+    def __init__(self):
+        self.tracks: List[GPXTrack] = []
+        self.routes: List[GPXRoute] = []
+        self.waypoints: List[GPXWaypoint] = []
+
+def _local_name(tag: str) -> str:
+    """Nombre del elemento sin namespace."""
+    return tag.rpartition("}")[2]
+
+def _child_text(elem, name: str) -> Optional[str]:
+    """Texto de un hijo directo (cualquier namespace) o None."""
+    text = elem.findtext(f"{{*}}{name}")
+    return text.strip() if text else None
+
+def _points_array(points) -> np.ndarray:
+    """
+    Convierte elementos trkpt/rtept en un arreglo (N, 3) de lon, lat y elevación.
+    
+    Los atributos y elevaciones se juntan como texto en una lista plana y se
+    convierten con una sola llamada a NumPy; la elevación faltante queda como NaN.
+    """
+    values = []
+    extend = values.extend
+    for point in points:
+        extend((point.get("lon"), point.get("lat"), point.findtext("{*}ele") or "nan"))
+    return np.array(values, dtype=np.float64).reshape(-1, 3)
+
+def _iter_gpx_items(gpx_file) -> Iterator:
+    """
+    Recorre los trk, rte y wpt de un GPX sin construir el árbol completo.
+    
+    Args:
+        gpx_file: Ruta o archivo GPX abierto en modo binario
+        
+    Yields:
+        Elementos completos (se liberan al avanzar al siguiente)
+    """
+    if HAS_LXML:
+        # El filtro por tag se evalúa en C dentro de libxml2
+        for _, elem in ET.iterparse(gpx_file, events=('end',), tag=GPX_ITEM_TAGS,
+                                    resolve_entities=False):
+            yield elem
+            
+            # Liberar el elemento y los hermanos ya procesados
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    else:
+        item_names = {_local_name(tag) for tag in GPX_ITEM_TAGS}
+        for _, elem in ET.iterparse(gpx_file, events=('end',)):
+            if _local_name(elem.tag) in item_names:
+                yield elem
+                elem.clear()
+
+def parse_gpx_stream(gpx_file) -> GPXData:
+    """
+    Lee un GPX en streaming, dejando las coordenadas en arreglos NumPy.
+    
+    A diferencia de gpxpy.parse no se crea un objeto por punto: cada
+    segmento o ruta termina en un único arreglo (N, 3).
+    
+    Args:
+        gpx_file: Ruta o archivo GPX abierto en modo binario
+        
+    Returns:
+        GPXData con tracks, rutas y waypoints
+    """
+    data = GPXData()
+    for elem in _iter_gpx_items(gpx_file):
+        kind = _local_name(elem.tag)
+        name = _child_text(elem, "name")
+        description = _child_text(elem, "desc")
+        
+        if kind == "trk":
+            segments = [_points_array(segment.iterfind("{*}trkpt"))
+                        for segment in elem.iterfind("{*}trkseg")]
+            data.tracks.append(GPXTrack(name, description, segments))
+        elif kind == "rte":
+            data.routes.append(GPXRoute(name, description,
+                                        _points_array(elem.iterfind("{*}rtept"))))
+        else:
+            elevation = elem.findtext("{*}ele")
+            data.waypoints.append(GPXWaypoint(
+                name, description, _child_text(elem, "cmt"),
+                _child_text(elem, "time"),
+                float(elem.get("lon")), float(elem.get("lat")),
+                float(elevation) if elevation else None
+            ))
+    return data
+
+def gpx_has_items(gpx_path: str) -> bool:
+    """
+    Indica si un GPX tiene al menos un track, ruta o waypoint.
+    
+    La lectura se detiene en el primer elemento encontrado, sin parsear
+    (ni dejar en caché) el resto del archivo.
+    
+    Args:
+        gpx_path: Ruta del archivo GPX
+        
+    Returns:
+        True si el GPX tiene contenido
+    """
+    with open(gpx_path, 'rb') as f:
+        for _ in _iter_gpx_items(f):
+            return True
+    return False
+
+@lru_cache(maxsize=4)
+def _parse_gpx(gpx_path: str, mtime_ns: int, size: int) -> GPXData:
+    """
+    Parsea un GPX una sola vez por versión del archivo.
+    
+    mtime_ns y size forman parte de la clave para invalidar la caché
+    cuando el archivo cambia en disco.
+    """
+    return parse_gpx_stream(gpx_path)
+
+def _polyline_length(points: np.ndarray) -> float:
+    """
+    Calcula la longitud 3D de una polilínea en metros.
+    
+    Cada tramo se mide con haversine sobre todo el arreglo a la vez y se
+    combina con la diferencia de elevación cuando ambos extremos la tienen.
+    
+    Args:
+        points: Arreglo (N, 3) de lon, lat y elevación (NaN si falta)
+        
+    Returns:
+        Longitud en metros
+    """
+    if len(points) < 2:
+        return 0.0
+    
+    lon, lat = np.deg2rad(points[:, 0]), np.deg2rad(points[:, 1])
+    a = (np.sin(np.diff(lat) / 2) ** 2
+         + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2)
+    distances = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(a))
+    
+    # Sin elevación en alguno de los extremos el tramo queda en 2D
+    dele = np.nan_to_num(np.diff(points[:, 2]), nan=0.0)
+    return float(np.hypot(distances, dele).sum())
+
+@lru_cache(maxsize=4)
+def _gpx_distances(gpx_path: str, mtime_ns: int, size: int) -> Dict[Tuple, Optional[float]]:
+    """
+    Calcula una sola vez las longitudes de todos los segmentos y rutas.
+    
+    Las claves son ("track", índice_track, índice_segmento) y ("route", índice_ruta).
+    """
+    gpx = _parse_gpx(gpx_path, mtime_ns, size)
+    distances = {}
+    for track_idx, track in enumerate(gpx.tracks):
+        for seg_idx, segment in enumerate(track.segments):
+            distances[("track", track_idx, seg_idx)] = _polyline_length(segment)
+    for route_idx, route in enumerate(gpx.routes):
+        distances[("route", route_idx)] = _polyline_length(route.points)
+    return distances
+
+def _gpx_cache_key(gpx_path: str) -> Tuple[str, int, int]:
+    """Clave de caché (ruta absoluta, mtime_ns, tamaño) de un GPX."""
+    stat = os.stat(gpx_path)
+    return os.path.abspath(gpx_path), stat.st_mtime_ns, stat.st_size
+
+def load_gpx(gpx_path: str) -> GPXData:
+    """
+    Obtiene el GPX parseado, reutilizando el resultado si el archivo no cambió.
+    
+    Args:
+        gpx_path: Ruta del archivo GPX
+        
+    Returns:
+        GPXData (compartido; no debe modificarse)
+    """
+    return _parse_gpx(*_gpx_cache_key(gpx_path))
+
 class GPXProcessor:
     """Procesador para archivos GPX."""
     
     def __init__(self):
+        # La conversión ya no usa archivos intermedios; temp_dirs se conserva
+        # para los directorios que registren quienes usan el procesador
         self.temp_dirs = []
+        # Respaldo si no se usa como context manager: se ejecuta al recolectar
+        # el objeto o al salir del intérprete, antes de desmontar los módulos
+        weakref.finalize(self, clean_temp_dirs, self.temp_dirs)
     
-    def __del__(self):
-        """Limpia directorios temporales al destruir el objeto."""
+    def __enter__(self):
+        """Permite usar el procesador en un bloque with."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Limpia los directorios temporales al salir del bloque with."""
         self.cleanup_temp_dirs()
+        return False
     
     def cleanup_temp_dirs(self):
         """Limpia todos los directorios temporales creados."""
-        for temp_dir in self.temp_dirs:
-            try:
-                import shutil
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
-            except Exception as e:
-                logger.warning(f"Error limpiando directorio temporal: {e}")
-        self.temp_dirs.clear()
+        clean_temp_dirs(self.temp_dirs)
     
     def convert_gpx_to_kmz(self, gpx_path: str, kmz_path: str = None) -> str:
         """
@@ -54,31 +287,25 @@ class GPXProcessor:
                 base_name = os.path.splitext(gpx_path)[0]
                 kmz_path = f"{base_name}.kmz"
             
-            # Parsear GPX
-            with open(gpx_path, 'r', encoding='utf-8') as f:
-                gpx = gpxpy.parse(f)
+            # Parsear GPX y calcular distancias (o reutilizar los de get_gpx_info)
+            key = _gpx_cache_key(gpx_path)
+            gpx = _parse_gpx(*key)
+            distances = _gpx_distances(*key)
             
-            # Crear KML usando simplekml
-            kml = simplekml.Kml()
+            # Crear KML
+            kml = KMLWriter()
             
             # Procesar tracks
-            self._process_tracks(gpx, kml)
+            self._process_tracks(gpx, kml, distances)
             
             # Procesar routes
-            self._process_routes(gpx, kml)
+            self._process_routes(gpx, kml, distances)
             
             # Procesar waypoints
             self._process_waypoints(gpx, kml)
             
-            # Guardar KML temporal
-            temp_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(temp_dir)
-            
-            kml_path = os.path.join(temp_dir, "doc.kml")
-            kml.save(kml_path)
-            
             # Crear KMZ
-            create_kmz_from_kml(kml_path, kmz_path)
+            write_kmz(kml.to_bytes(), kmz_path)
             
             logger.info(f"GPX convertido a KMZ: {kmz_path}")
             return kmz_path
@@ -87,25 +314,26 @@ class GPXProcessor:
             logger.error(f"Error convirtiendo GPX a KMZ: {e}")
             raise
     
-    def _process_tracks(self, gpx, kml: simplekml.Kml) -> None:
+    def _process_tracks(self, gpx, kml: KMLWriter, distances: Dict[Tuple, Optional[float]]) -> None:
         """
         Procesa tracks del GPX y los agrega al KML.
         
         Args:
             gpx: Objeto GPX parseado
             kml: Objeto KML de destino
+            distances: Longitudes precalculadas de segmentos y rutas
         """
         for track_idx, track in enumerate(gpx.tracks):
             track_name = track.name or f"Track {track_idx + 1}"
             
             # Crear carpeta para el track si tiene múltiples segmentos
             if len(track.segments) > 1:
-                track_folder = kml.newfolder(name=track_name)
+                track_folder = kml.new_folder(track_name)
             else:
-                track_folder = kml
+                track_folder = None
             
             for seg_idx, segment in enumerate(track.segments):
-                if not segment.points:
+                if not len(segment):
                     continue
                 
                 # Nombre del segmento
@@ -114,20 +342,8 @@ class GPXProcessor:
                 else:
                     seg_name = track_name
                 
-                # Crear LineString
-                linestring = track_folder.newlinestring(name=seg_name)
-                
                 # Agregar coordenadas
-                coords = []
-                for point in segment.points:
-                    elevation = point.elevation if point.elevation is not None else 0
-                    coords.append((point.longitude, point.latitude, elevation))
-                
-                linestring.coords = coords
-                
-                # Estilo de línea
-                linestring.style.linestyle.color = simplekml.Color.red
-                linestring.style.linestyle.width = 3
+                coords = self._points_to_coords(segment)
                 
                 # Descripción con información del track
                 description_parts = []
@@ -135,48 +351,39 @@ class GPXProcessor:
                     description_parts.append(f"Descripción: {track.description}")
                 
                 # Estadísticas del segmento
-                if segment.points:
-                    description_parts.append(f"Puntos: {len(segment.points)}")
-                    
-                    # Calcular distancia si es posible
-                    try:
-                        distance = segment.length_3d() or segment.length_2d()
-                        if distance:
-                            description_parts.append(f"Distancia: {distance/1000:.2f} km")
-                    except:
-                        pass
+                description_parts.append(f"Puntos: {len(segment)}")
+                
+                # Distancia si se pudo calcular
+                distance = distances.get(("track", track_idx, seg_idx))
+                if distance:
+                    description_parts.append(f"Distancia: {distance/1000:.2f} km")
                 
-                if description_parts:
-                    linestring.description = "\n".join(description_parts)
+                # Crear LineString con estilo de línea
+                kml.add_linestring(
+                    track_folder,
+                    seg_name,
+                    coords,
+                    description="\n".join(description_parts),
+                    style_id=kml.line_style(KML_COLORS["red"], 3)
+                )
     
-    def _process_routes(self, gpx, kml: simplekml.Kml) -> None:
+    def _process_routes(self, gpx, kml: KMLWriter, distances: Dict[Tuple, Optional[float]]) -> None:
         """
         Procesa routes del GPX y los agrega al KML.
         
         Args:
             gpx: Objeto GPX parseado
             kml: Objeto KML de destino
+            distances: Longitudes precalculadas de segmentos y rutas
         """
         for route_idx, route in enumerate(gpx.routes):
-            if not route.points:
+            if not len(route.points):
                 continue
             
             route_name = route.name or f"Ruta {route_idx + 1}"
             
-            # Crear LineString para la ruta
-            linestring = kml.newlinestring(name=route_name)
-            
             # Agregar coordenadas
-            coords = []
-            for point in route.points:
-                elevation = point.elevation if point.elevation is not None else 0
-                coords.append((point.longitude, point.latitude, elevation))
-            
-            linestring.coords = coords
-            
-            # Estilo de línea (diferente color para rutas)
-            linestring.style.linestyle.color = simplekml.Color.blue
-            linestring.style.linestyle.width = 3
+            coords = self._points_to_coords(route.points)
             
             # Descripción
             description_parts = []
@@ -185,18 +392,37 @@ class GPXProcessor:
             
             description_parts.append(f"Puntos: {len(route.points)}")
             
-            # Calcular distancia
-            try:
-                distance = route.length_3d() or route.length_2d()
-                if distance:
-                    description_parts.append(f"Distancia: {distance/1000:.2f} km")
-            except:
-                pass
+            # Distancia si se pudo calcular
+            distance = distances.get(("route", route_idx))
+            if distance:
+                description_parts.append(f"Distancia: {distance/1000:.2f} km")
+            
+            # Crear LineString (diferente color para rutas)
+            kml.add_linestring(
+                None,
+                route_name,
+                coords,
+                description="\n".join(description_parts),
+                style_id=kml.line_style(KML_COLORS["blue"], 3)
+            )
+    
+    @staticmethod
+    def _points_to_coords(points: np.ndarray) -> np.ndarray:
+        """
+        Convierte un arreglo de puntos en coordenadas (lon, lat, elevación).
+        
+        Args:
+            points: Arreglo (N, 3) de un segmento de track o ruta
             
-            if description_parts:
-                linestring.description = "\n".join(description_parts)
+        Returns:
+            Arreglo (N, 3) con elevación 0 donde no existe (KMLWriter lo
+            formatea de una sola vez)
+        """
+        coords = points.copy()
+        coords[:, 2] = np.nan_to_num(coords[:, 2], nan=0.0)
+        return coords
     
-    def _process_waypoints(self, gpx, kml: simplekml.Kml) -> None:
+    def _process_waypoints(self, gpx, kml: KMLWriter) -> None:
         """
         Procesa waypoints del GPX y los agrega al KML.
         
@@ -209,18 +435,18 @@ class GPXProcessor:
         
         # Crear carpeta para waypoints si hay muchos
         if len(gpx.waypoints) > 5:
-            waypoint_folder = kml.newfolder(name="Waypoints")
+            waypoint_folder = kml.new_folder("Waypoints")
         else:
-            waypoint_folder = kml
+            waypoint_folder = None
+        
+        # Estilo del punto
+        style_id = kml.icon_style("http://maps.google.com/mapfiles/kml/pushpin/ylw-pushpin.png", 1.2)
         
+        names, descriptions, coords = [], [], []
         for wp_idx, waypoint in enumerate(gpx.waypoints):
-            wp_name = waypoint.name or f"Waypoint {wp_idx + 1}"
-            
-            # Crear punto
-            point = waypoint_folder.newpoint(name=wp_name)
-            
+            names.append(waypoint.name or f"Waypoint {wp_idx + 1}")
             elevation = waypoint.elevation if waypoint.elevation is not None else 0
-            point.coords = [(waypoint.longitude, waypoint.latitude, elevation)]
+            coords.append((waypoint.longitude, waypoint.latitude, elevation))
             
             # Descripción
             description_parts = []
@@ -236,12 +462,10 @@ class GPXProcessor:
             if waypoint.time:
                 description_parts.append(f"Tiempo: {waypoint.time}")
             
-            if description_parts:
-                point.description = "\n".join(description_parts)
-            
-            # Estilo del punto
-            point.style.iconstyle.icon.href = "http://maps.google.com/mapfiles/kml/pushpin/ylw-pushpin.png"
-            point.style.iconstyle.scale = 1.2
+            descriptions.append("\n".join(description_parts))
+        
+        # Todos los puntos como un solo fragmento de texto
+        kml.add_points(waypoint_folder, names, coords, descriptions, style_id=style_id)
     
     def get_gpx_info(self, gpx_path: str) -> Dict[str, Any]:
         """
@@ -254,8 +478,9 @@ class GPXProcessor:
             Diccionario con información del GPX
         """
         try:
-            with open(gpx_path, 'r', encoding='utf-8') as f:
-                gpx = gpxpy.parse(f)
+            key = _gpx_cache_key(gpx_path)
+            gpx = _parse_gpx(*key)
+            distances = _gpx_distances(*key)
             
             info = {
                 "tracks": len(gpx.tracks),
@@ -266,34 +491,22 @@ class GPXProcessor:
                 "bounds": None
             }
             
-            # Contar puntos y calcular distancia total
-            for track in gpx.tracks:
-                for segment in track.segments:
-                    info["total_points"] += len(segment.points)
-                    try:
-                        distance = segment.length_3d() or segment.length_2d()
-                        if distance:
-                            info["total_distance"] += distance
-                    except:
-                        pass
-            
-            for route in gpx.routes:
-                info["total_points"] += len(route.points)
-                try:
-                    distance = route.length_3d() or route.length_2d()
-                    if distance:
-                        info["total_distance"] += distance
-                except:
-                    pass
-            
-            # Obtener bounds
-            bounds = gpx.get_bounds()
-            if bounds:
+            # Contar puntos y sumar distancias precalculadas
+            track_segments = [segment for track in gpx.tracks for segment in track.segments]
+            info["total_points"] = (sum(map(len, track_segments))
+                                    + sum(len(route.points) for route in gpx.routes))
+            info["total_distance"] = float(sum(d for d in distances.values() if d))
+            
+            # Obtener bounds (de los tracks, como gpxpy)
+            track_points = [segment for segment in track_segments if len(segment)]
+            if track_points:
+                points = np.concatenate(track_points)
+                mins, maxs = points.min(axis=0), points.max(axis=0)
                 info["bounds"] = {
-                    "min_lat": bounds.min_latitude,
-                    "max_lat": bounds.max_latitude,
-                    "min_lon": bounds.min_longitude,
-                    "max_lon": bounds.max_longitude
+                    "min_lat": float(mins[1]),
+                    "max_lat": float(maxs[1]),
+                    "min_lon": float(mins[0]),
+                    "max_lon": float(maxs[0])
                 }
             
             return info
@@ -0,0 +1,265 @@
+
+"""
+Escritor de KML ligero basado en ElementTree.
+Reemplaza a simplekml y al driver KML de OGR en la generación de KMZ.
+"""
+
+import xml.etree.ElementTree as ET
+from itertools import repeat
+from typing import Iterable, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+import numpy as np
+
+KML_NAMESPACE = "http://www.opengis.net/kml/2.2"
+
+# Colores KML en formato aabbggrr
+KML_COLORS = {
+    "red": "ff0000ff",
+    "blue": "ffff0000"
+}
+
+
+class KMLWriter:
+    """
+    Construye un documento KML con carpetas, líneas y puntos.
+    
+    Los estilos se declaran una sola vez en el Document y los Placemarks
+    los referencian con styleUrl, en lugar de repetir un Style por elemento.
+    """
+    
+    def __init__(self):
+        self.root = ET.Element("kml", xmlns=KML_NAMESPACE)
+        self.document = ET.SubElement(self.root, "Document")
+        self._styles = {}
+        self._fragments = {}
+    
+    def new_folder(self, name: str, parent: Optional[ET.Element] = None) -> ET.Element:
+        """
+        Crea una carpeta.
+        
+        Args:
+            name: Nombre de la carpeta
+            parent: Contenedor padre (por defecto el Document)
+        
+        Returns:
+            Elemento Folder creado
+        """
+        folder = ET.SubElement(self.document if parent is None else parent, "Folder")
+        ET.SubElement(folder, "name").text = name
+        return folder
+    
+    def line_style(self, color: str, width: float) -> str:
+        """
+        Obtiene (o declara) un estilo de línea compartido.
+        
+        Args:
+            color: Color KML (aabbggrr)
+            width: Ancho de línea
+        
+        Returns:
+            Identificador del estilo
+        """
+        key = ("line", color, width)
+        if key not in self._styles:
+            style = self._new_style(key)
+            line_style = ET.SubElement(style, "LineStyle")
+            ET.SubElement(line_style, "color").text = color
+            ET.SubElement(line_style, "width").text = str(width)
+        return self._styles[key]
+    
+    def icon_style(self, href: str, scale: float) -> str:
+        """
+        Obtiene (o declara) un estilo de ícono compartido.
+        
+        Args:
+            href: URL del ícono
+            scale: Escala del ícono
+        
+        Returns:
+            Identificador del estilo
+        """
+        key = ("icon", href, scale)
+        if key not in self._styles:
+            style = self._new_style(key)
+            icon_style = ET.SubElement(style, "IconStyle")
+            ET.SubElement(icon_style, "scale").text = str(scale)
+            icon = ET.SubElement(icon_style, "Icon")
+            ET.SubElement(icon, "href").text = href
+        return self._styles[key]
+    
+    def add_linestring(self, parent: Optional[ET.Element], name: str,
+                       coords: Iterable[Tuple[float, float, float]],
+                       description: Optional[str] = None,
+                       style_id: Optional[str] = None) -> ET.Element:
+        """
+        Agrega un Placemark con LineString.
+        
+        Args:
+            parent: Contenedor (Folder o None para el Document)
+            name: Nombre del Placemark
+            coords: Coordenadas (lon, lat, elevación)
+            description: Descripción (opcional)
+            style_id: Estilo compartido (opcional)
+        
+        Returns:
+            Elemento Placemark creado
+        """
+        placemark = self._new_placemark(parent, name, description, style_id)
+        linestring = ET.SubElement(placemark, "LineString")
+        ET.SubElement(linestring, "coordinates").text = self.format_coordinates(coords)
+        return placemark
+    
+    def add_point(self, parent: Optional[ET.Element], name: str,
+                  coord: Tuple[float, float, float],
+                  description: Optional[str] = None,
+                  style_id: Optional[str] = None) -> ET.Element:
+        """
+        Agrega un Placemark con Point.
+        
+        Args:
+            parent: Contenedor (Folder o None para el Document)
+            name: Nombre del Placemark
+            coord: Coordenada (lon, lat, elevación)
+            description: Descripción (opcional)
+            style_id: Estilo compartido (opcional)
+        
+        Returns:
+            Elemento Placemark creado
+        """
+        placemark = self._new_placemark(parent, name, description, style_id)
+        point = ET.SubElement(placemark, "Point")
+        ET.SubElement(point, "coordinates").text = self.format_coordinates([coord])
+        return placemark
+    
+    def add_points(self, parent: Optional[ET.Element], names: Iterable[str],
+                   coords: Iterable[Sequence[float]],
+                   descriptions: Optional[Iterable[str]] = None,
+                   style_id: Optional[str] = None) -> None:
+        """
+        Agrega muchos Placemarks con Point de una vez.
+        
+        Genera el mismo KML que llamar a add_point por cada punto, pero arma
+        el texto con un join en lugar de crear cinco elementos por punto; el
+        fragmento se inserta en su lugar al serializar.
+        
+        Args:
+            parent: Contenedor (Folder o None para el Document)
+            names: Nombres de los Placemarks
+            coords: Coordenadas (lon, lat[, elevación]) de cada punto
+            descriptions: Descripciones (opcional, vacías se omiten)
+            style_id: Estilo compartido (opcional)
+        """
+        style = f"<styleUrl>#{style_id}</styleUrl>" if style_id else ""
+        if descriptions is None:
+            descriptions = repeat("")
+        
+        fragment = "".join(
+            f"<Placemark><name>{escape(name)}</name>"
+            + (f"<description>{escape(description)}</description>" if description else "")
+            + f"{style}<Point><coordinates>{','.join(map(str, coord))}</coordinates></Point></Placemark>"
+            for name, description, coord in zip(names, descriptions, coords)
+        )
+        
+        # Marcador que to_bytes reemplaza por el fragmento ya serializado
+        token = f"fastsig-fragment-{len(self._fragments)}"
+        (self.document if parent is None else parent).append(ET.Comment(token))
+        self._fragments[token] = fragment.encode("utf-8")
+    
+    def add_geometry(self, parent: Optional[ET.Element], name: str, geometry,
+                     description: Optional[str] = None,
+                     style_id: Optional[str] = None) -> Optional[ET.Element]:
+        """
+        Agrega un Placemark con cualquier geometría de shapely.
+        
+        Args:
+            parent: Contenedor (Folder o None para el Document)
+            name: Nombre del Placemark
+            geometry: Geometría shapely (Point, LineString, Polygon o Multi*)
+            description: Descripción (opcional)
+            style_id: Estilo compartido (opcional)
+        
+        Returns:
+            Elemento Placemark creado o None si la geometría está vacía
+        """
+        if geometry is None or geometry.is_empty:
+            return None
+        
+        placemark = self._new_placemark(parent, name, description, style_id)
+        self._append_geometry(placemark, geometry)
+        return placemark
+    
+    @staticmethod
+    def format_coordinates(coords: Iterable[Sequence[float]]) -> str:
+        """
+        Serializa coordenadas como 'lon,lat[,ele]' separadas por espacios.
+        
+        Un arreglo NumPy (N, k) se formatea con una sola plantilla de %
+        (mismo texto que str() por valor) en lugar de un join por punto.
+        """
+        if isinstance(coords, np.ndarray):
+            rows, cols = coords.shape
+            template = " ".join([",".join(["%r"] * cols)] * rows)
+            return template % tuple(coords.ravel().tolist())
+        return " ".join(",".join(map(str, coord)) for coord in coords)
+    
+    def to_bytes(self) -> bytes:
+        """Serializa el documento KML en UTF-8."""
+        data = ET.tostring(self.root, encoding="UTF-8", xml_declaration=True)
+        for token, fragment in self._fragments.items():
+            data = data.replace(f"<!--{token}-->".encode("utf-8"), fragment, 1)
+        return data
+    
+    def save(self, path: str) -> None:
+        """
+        Guarda el documento KML.
+        
+        Args:
+            path: Ruta de salida del KML
+        """
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+    
+    def _new_style(self, key: tuple) -> ET.Element:
+        """Declara un estilo nuevo al inicio del Document."""
+        style_id = f"style{len(self._styles) + 1}"
+        self._styles[key] = style_id
+        style = ET.Element("Style", id=style_id)
+        self.document.insert(len(self._styles) - 1, style)
+        return style
+    
+    def _append_geometry(self, parent: ET.Element, geometry) -> None:
+        """Agrega la representación KML de una geometría shapely."""
+        geom_type = geometry.geom_type
+        if geom_type == "Point":
+            point = ET.SubElement(parent, "Point")
+            ET.SubElement(point, "coordinates").text = self.format_coordinates(geometry.coords)
+        elif geom_type in ("LineString", "LinearRing"):
+            linestring = ET.SubElement(parent, "LineString")
+            ET.SubElement(linestring, "coordinates").text = self.format_coordinates(geometry.coords)
+        elif geom_type == "Polygon":
+            polygon = ET.SubElement(parent, "Polygon")
+            self._append_ring(polygon, "outerBoundaryIs", geometry.exterior)
+            for interior in geometry.interiors:
+                self._append_ring(polygon, "innerBoundaryIs", interior)
+        else:
+            # MultiPoint, MultiLineString, MultiPolygon y GeometryCollection
+            multi = ET.SubElement(parent, "MultiGeometry")
+            for part in geometry.geoms:
+                if not part.is_empty:
+                    self._append_geometry(multi, part)
+    
+    def _append_ring(self, polygon: ET.Element, boundary: str, ring) -> None:
+        """Agrega un anillo exterior o interior a un Polygon."""
+        linear_ring = ET.SubElement(ET.SubElement(polygon, boundary), "LinearRing")
+        ET.SubElement(linear_ring, "coordinates").text = self.format_coordinates(ring.coords)
+    
+    def _new_placemark(self, parent: Optional[ET.Element], name: str,
+                       description: Optional[str], style_id: Optional[str]) -> ET.Element:
+        """Crea un Placemark con nombre, descripción y estilo."""
+        placemark = ET.SubElement(self.document if parent is None else parent, "Placemark")
+        ET.SubElement(placemark, "name").text = name
+        if description:
+            ET.SubElement(placemark, "description").text = description
+        if style_id:
+            ET.SubElement(placemark, "styleUrl").text = f"#{style_id}"
+        return placemark
@@ -3,40 +3,95 @@
 Procesador para archivos KMZ - extracción y generación.
 """
 
-import os
-import tempfile
+import re
+import weakref
 import zipfile
-import xml.etree.ElementTree as ET
-from typing import List, Tuple, Dict, Any
+import importlib.util
+from typing import List, Tuple, Dict, Any, Iterator, Optional
+import numpy as np
 import pandas as pd
-import geopandas as gpd
-from shapely.geometry import Point
-from pyproj import Transformer
 
-from src.core.config import logger, DEFAULT_CRS
-from src.core.utils import extract_kmz_to_kml, create_kmz_from_kml, convert_coordinates
-from src.core.validators import ValidationError
+# lxml (libxml2) es más rápido que ElementTree; se usa si está instalado
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
+# xlsxwriter escribe Excel más rápido que openpyxl; se usa si está instalado
+EXCEL_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+
+# python-calamine (lector nativo en Rust) lee Excel más rápido que openpyxl;
+# None deja que pandas elija el motor por defecto
+EXCEL_READ_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+from .config import logger, DEFAULT_CRS
+from .utils import (open_kml_from_kmz, kml_vsi_path, write_kmz,
+                    convert_coordinates_bulk, transform_geometries, estimate_utm_crs, clean_temp_dirs)
+from .validators import ValidationError
+from .kml_writer import KMLWriter
+
+# Namespace KML
+KML_NS = {'kml': 'http://www.opengis.net/kml/2.2'}
+PLACEMARK_TAG = f"{{{KML_NS['kml']}}}Placemark"
+
+# Consultas XPath precompiladas para leer cada Placemark (solo lxml); sin
+# smart_strings los resultados no retienen el elemento de origen
+if HAS_LXML:
+    XPATH_NAME = ET.XPath('kml:name/text()', namespaces=KML_NS, smart_strings=False)
+    XPATH_DESCRIPTION = ET.XPath('kml:description/text()', namespaces=KML_NS, smart_strings=False)
+    XPATH_POINT_COORDS = ET.XPath('.//kml:Point/kml:coordinates/text()', namespaces=KML_NS,
+                                  smart_strings=False)
+
+# Separador de componentes en <coordinates> ("lon,lat[,alt]", con espacios opcionales)
+COORD_SEPARATOR_RE = re.compile(r'[\s,]+')
+
+def read_excel(excel_path: str, **kwargs) -> pd.DataFrame:
+    """
+    Lee un Excel con el motor más rápido disponible.
+    
+    pandas acepta engine="calamine" recién desde la versión 2.2; si el
+    motor no está disponible se vuelve a leer con el motor por defecto.
+    
+    Args:
+        excel_path: Ruta del archivo Excel
+        **kwargs: Argumentos adicionales para pandas.read_excel
+    
+    Returns:
+        DataFrame con los datos leídos
+    """
+    if EXCEL_READ_ENGINE is not None:
+        try:
+            return pd.read_excel(excel_path, engine=EXCEL_READ_ENGINE, **kwargs)
+        except (ValueError, ImportError) as e:
+            logger.debug(f"Motor {EXCEL_READ_ENGINE} no disponible, usando el por defecto: {e}")
+    return pd.read_excel(excel_path, **kwargs)
 
 class KMZProcessor:
     """Procesador principal para archivos KMZ."""
     
     def __init__(self):
+        # Los KMZ se leen y escriben en memoria; temp_dirs se conserva para
+        # los directorios que registren quienes usan el procesador
         self.temp_dirs = []
+        self._utm_crs_cache = {}
+        # Respaldo si no se usa como context manager: se ejecuta al recolectar
+        # el objeto o al salir del intérprete, antes de desmontar los módulos
+        weakref.finalize(self, clean_temp_dirs, self.temp_dirs)
+    
+    def __enter__(self):
+        """Permite usar el procesador en un bloque with."""
+        return self
     
-    def __del__(self):
-        """Limpia directorios temporales al destruir el objeto."""
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Limpia los directorios temporales al salir del bloque with."""
         self.cleanup_temp_dirs()
+        return False
     
     def cleanup_temp_dirs(self):
         """Limpia todos los directorios temporales creados."""
-        for temp_dir in self.temp_dirs:
-            try:
-                import shutil
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
-            except Exception as e:
-                logger.warning(f"Error limpiando directorio temporal: {e}")
-        self.temp_dirs.clear()
+        clean_temp_dirs(self.temp_dirs)
     
     def extract_coordinates_to_excel(self, kmz_path: str, excel_path: str, 
                                    target_crs: str = DEFAULT_CRS["utm_chile"]) -> bool:
@@ -46,48 +101,59 @@ class KMZProcessor:
         Args:
             kmz_path: Ruta del archivo KMZ
             excel_path: Ruta de salida del Excel
-            target_crs: CRS de destino para las coordenadas
+            target_crs: CRS de destino para las coordenadas ("auto" para la zona UTM de los datos)
             
         Returns:
             True si la operación fue exitosa
         """
         try:
-            temp_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(temp_dir)
-            
-            # Extraer coordenadas
-            coordinates = self._extract_coordinates_from_kmz(kmz_path, temp_dir)
+            # Extraer coordenadas directamente como arreglos
+            names, descriptions, lons, lats = self._extract_coordinate_arrays(kmz_path)
             
-            if not coordinates:
+            if not len(lons):
                 raise ValidationError("No se encontraron coordenadas en el archivo KMZ")
             
-            # Convertir a DataFrame
-            data = []
-            transformer = Transformer.from_crs(DEFAULT_CRS["geographic"], target_crs, always_xy=True)
+            if target_crs == "auto":
+                target_crs = estimate_utm_crs(
+                    (np.nanmin(lons) + np.nanmax(lons)) / 2,
+                    (np.nanmin(lats) + np.nanmax(lats)) / 2
+                )
+                logger.info(f"CRS de destino auto-detectado: {target_crs}")
             
-            for name, description, lon, lat in coordinates:
-                try:
-                    # Convertir coordenadas
-                    x, y = transformer.transform(lon, lat)
-                    
-                    data.append({
-                        "Nombre del Punto": name,
-                        "Descripción": description,
-                        "Longitud": lon,
-                        "Latitud": lat,
-                        "Este": x,
-                        "Norte": y
-                    })
-                except Exception as e:
-                    logger.warning(f"Error convirtiendo coordenadas para {name}: {e}")
-                    continue
+            # Convertir coordenadas en una sola llamada
+            xs, ys = convert_coordinates_bulk(lons, lats, DEFAULT_CRS["geographic"], target_crs)
             
-            if not data:
+            # Descartar puntos que no se pudieron convertir
+            valid = np.isfinite(xs) & np.isfinite(ys)
+            if not valid.any():
                 raise ValidationError("No se pudieron procesar las coordenadas")
             
+            skipped = len(valid) - int(np.count_nonzero(valid))
+            if skipped:
+                logger.warning(f"Se omitieron {skipped} puntos con coordenadas no convertibles")
+                names, descriptions = names[valid], descriptions[valid]
+                lons, lats, xs, ys = lons[valid], lats[valid], xs[valid], ys[valid]
+            
+            columns = {
+                "Nombre del Punto": names,
+                "Descripción": descriptions,
+                "Longitud": lons,
+                "Latitud": lats,
+                "Este": xs,
+                "Norte": ys
+            }
+            
             # Exportar a Excel
-            df = pd.DataFrame(data)
-            df.to_excel(excel_path, index=False)
+            if EXCEL_ENGINE == "xlsxwriter":
+                self._write_excel_rows(excel_path, columns)
+            else:
+                # Convertir a DataFrame columna a columna, con tipos explícitos
+                # para que pandas no tenga que inferirlos
+                df = pd.DataFrame({
+                    header: pd.array(values, dtype="string") if values.dtype == object else values
+                    for header, values in columns.items()
+                })
+                df.to_excel(excel_path, index=False, engine=EXCEL_ENGINE)
             
             logger.info(f"Coordenadas exportadas a Excel: {excel_path}")
             return True
@@ -96,6 +162,38 @@ class KMZProcessor:
             logger.error(f"Error extrayendo coordenadas a Excel: {e}")
             raise
     
+    def _write_excel_rows(self, excel_path: str, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Escribe columnas paralelas en un Excel con xlsxwriter en modo constant_memory.
+        
+        Las filas se escriben en orden y se vuelcan a disco a medida que se
+        completan, en lugar de armar la hoja completa en memoria como hace
+        DataFrame.to_excel (que además escribe celda por celda en Python).
+        
+        Args:
+            excel_path: Ruta de salida del Excel
+            columns: Encabezado -> arreglo de valores (todos del mismo largo)
+        """
+        import xlsxwriter
+        
+        workbook = xlsxwriter.Workbook(excel_path, {
+            "constant_memory": True,
+            # Los nombres y descripciones se escriben tal cual, sin convertirlos
+            # en hipervínculos, números o fórmulas
+            "strings_to_urls": False,
+            "strings_to_numbers": False,
+            "strings_to_formulas": False
+        })
+        try:
+            worksheet = workbook.add_worksheet("Sheet1")
+            header_format = workbook.add_format({"bold": True, "border": 1})
+            worksheet.write_row(0, 0, list(columns), header_format)
+            
+            for row, values in enumerate(zip(*(col.tolist() for col in columns.values())), start=1):
+                worksheet.write_row(row, 0, values)
+        finally:
+            workbook.close()
+    
     def create_kmz_from_excel(self, excel_path: str, kmz_path: str,
                             name_col: str = "nombre", 
                             x_col: str = "este", 
@@ -118,8 +216,9 @@ class KMZProcessor:
             True si la operación fue exitosa
         """
         try:
-            # Leer Excel
-            df = pd.read_excel(excel_path)
+            # Leer solo las columnas necesarias
+            wanted_cols = {name_col, x_col, y_col, desc_col}
+            df = read_excel(excel_path, usecols=lambda col: col in wanted_cols)
             
             # Validar columnas requeridas
             required_cols = {name_col, x_col, y_col}
@@ -131,25 +230,29 @@ class KMZProcessor:
             if desc_col not in df.columns:
                 df[desc_col] = ""
             
-            # Crear GeoDataFrame
-            geometry = [Point(row[x_col], row[y_col]) for _, row in df.iterrows()]
-            gdf = gpd.GeoDataFrame(df, geometry=geometry, crs=source_crs)
-            
-            # Convertir a WGS84 para KML
-            gdf = gdf.to_crs(DEFAULT_CRS["geographic"])
-            
-            # Asignar nombre para KML
-            gdf["Name"] = gdf[name_col]
-            gdf["Description"] = gdf[desc_col]
+            # Descartar filas con coordenadas no numéricas
+            xs = pd.to_numeric(df[x_col], errors='coerce').to_numpy(dtype=np.float64)
+            ys = pd.to_numeric(df[y_col], errors='coerce').to_numpy(dtype=np.float64)
+            valid = np.isfinite(xs) & np.isfinite(ys)
+            if not valid.any():
+                raise ValidationError("No hay filas con coordenadas numéricas válidas")
+            if not valid.all():
+                logger.warning(f"Se omitieron {len(valid) - int(np.count_nonzero(valid))} filas con coordenadas no numéricas")
+                df, xs, ys = df[valid], xs[valid], ys[valid]
+            
+            # Convertir a WGS84 para KML con el Transformer en caché (no hace
+            # nada si el origen ya es WGS84)
+            xs, ys = convert_coordinates_bulk(xs, ys, source_crs, DEFAULT_CRS["geographic"])
+            
+            # Escribir los puntos directamente, sin pasar por el driver KML de OGR
+            # (listas planas: iterar una Series crea un escalar pandas por fila)
+            kml = KMLWriter()
+            names = df[name_col].fillna("").astype(str).tolist()
+            descriptions = df[desc_col].fillna("").astype(str).tolist()
+            kml.add_points(None, names, zip(xs.tolist(), ys.tolist()), descriptions)
             
             # Crear KMZ
-            temp_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(temp_dir)
-            
-            kml_path = os.path.join(temp_dir, "doc.kml")
-            gdf.to_file(kml_path, driver="KML")
-            
-            create_kmz_from_kml(kml_path, kmz_path)
+            write_kmz(kml.to_bytes(), kmz_path)
             
             logger.info(f"KMZ creado desde Excel: {kmz_path}")
             return True
@@ -173,59 +276,83 @@ class KMZProcessor:
             True si la operación fue exitosa
         """
         try:
-            temp_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(temp_dir)
+            import geopandas as gpd
+            import shapely
             
-            # Extraer y leer KML
-            kml_path = extract_kmz_to_kml(input_kmz, temp_dir)
-            gdf = gpd.read_file(kml_path, driver='KML')
+            gdf = self.read_kmz_geometries(input_kmz)
             
             if gdf.empty:
                 raise ValidationError("No se encontraron geometrías en el archivo KMZ")
             
+            # El driver LIBKML entrega la descripción en minúsculas
+            gdf = gdf.rename(columns={"description": "Description"})
+            if "Description" not in gdf:
+                gdf["Description"] = ""
+            
             # Configurar CRS
             if gdf.crs is None:
                 gdf = gdf.set_crs(DEFAULT_CRS["geographic"])
             
             original_crs = gdf.crs
             
-            # Convertir a UTM si es necesario para buffer preciso
+            # Proyectar a UTM solo una copia 2D para el buffer: los originales
+            # no hacen el viaje de ida y vuelta y la cota (que el buffer
+            # descarta) no se transforma
+            # (todos los vértices se reproyectan en una sola llamada a PROJ)
+            work = gdf.geometry
             if original_crs.is_geographic:
-                utm_crs = gdf.estimate_utm_crs()
-                gdf = gdf.to_crs(utm_crs)
+                utm_crs = self._get_utm_crs(gdf)
+                work = gpd.GeoSeries(
+                    transform_geometries(shapely.force_2d(np.asarray(work.values)),
+                                         original_crs, utm_crs),
+                    crs=utm_crs
+                )
             
             # Aplicar buffer
             if combine_buffers:
-                # Combinar todas las geometrías y aplicar buffer
-                from shapely.ops import unary_union
-                combined_geom = unary_union(gdf.geometry.tolist())
-                buffered_geom = combined_geom.buffer(buffer_distance)
+                # Combinar todas las geometrías (unión en cascada de GEOS) y aplicar buffer
+                if hasattr(work, "union_all"):
+                    combined_geom = work.union_all()
+                else:
+                    combined_geom = work.unary_union
+                buffered = np.array([combined_geom.buffer(buffer_distance)], dtype=object)
+                if original_crs.is_geographic:
+                    buffered = transform_geometries(buffered, utm_crs, original_crs)
                 
                 result = gpd.GeoDataFrame(
                     {"Name": [f"Buffer combinado ({buffer_distance}m)"],
                      "Description": [f"Buffer de {buffer_distance} metros aplicado a todas las geometrías"]},
-                    geometry=[buffered_geom],
-                    crs=gdf.crs
+                    geometry=buffered,
+                    crs=original_crs
                 )
             else:
-                # Aplicar buffer individual
-                gdf_buffered = gdf.copy()
-                gdf_buffered.geometry = gdf.geometry.buffer(buffer_distance)
-                gdf_buffered["Description"] = f"Buffer de {buffer_distance}m"
+                # Aplicar buffer individual y devolver solo los buffers al CRS original
+                buffered = np.asarray(work.buffer(buffer_distance).values)
+                if original_crs.is_geographic:
+                    buffered = transform_geometries(buffered, utm_crs, original_crs)
+                names = gdf["Name"].to_numpy()
                 
-                # Combinar originales y buffers
-                result = pd.concat([gdf, gdf_buffered], ignore_index=True)
-                result = gpd.GeoDataFrame(result, crs=gdf.crs)
-            
-            # Convertir de vuelta al CRS original
-            if original_crs.is_geographic:
-                result = result.to_crs(original_crs)
+                # Combinar originales y buffers en un solo GeoDataFrame, sin copiar
+                # columnas que el KML no usa
+                result = gpd.GeoDataFrame(
+                    {"Name": np.concatenate([names, names]),
+                     "Description": np.concatenate([
+                         gdf["Description"].to_numpy(dtype=object),
+                         np.full(len(gdf), f"Buffer de {buffer_distance}m", dtype=object)
+                     ])},
+                    geometry=np.concatenate([np.asarray(gdf.geometry.values),
+                                             buffered]),
+                    crs=original_crs
+                )
             
             # Guardar como KML y crear KMZ
-            output_kml = os.path.join(temp_dir, "buffered.kml")
-            result.to_file(output_kml, driver="KML")
+            kml = KMLWriter()
+            names = result["Name"].fillna("").astype(str).tolist()
+            descriptions = result["Description"].fillna("").astype(str).tolist()
+            for name, description, geometry in zip(names, descriptions, result.geometry.values):
+                kml.add_geometry(None, name, geometry, description=description)
             
-            create_kmz_from_kml(output_kml, output_kmz)
+            write_kmz(kml.to_bytes(), output_kmz, "buffered.kml")
             
             logger.info(f"Buffer aplicado y KMZ creado: {output_kmz}")
             return True
@@ -234,61 +361,218 @@ class KMZProcessor:
             logger.error(f"Error aplicando buffer a KMZ: {e}")
             raise
     
-    def _extract_coordinates_from_kmz(self, kmz_path: str, temp_dir: str) -> List[Tuple[str, str, float, float]]:
+    def read_kmz_geometries(self, kmz_path: str):
         """
-        Extrae coordenadas de un archivo KMZ.
+        Lee las geometrías de un KMZ sin extraerlo a disco.
+        
+        El KML se lee directamente desde el ZIP con /vsizip/ de GDAL; si la
+        compilación de GDAL no lo soporta, se le pasa el flujo descomprimido.
         
         Args:
             kmz_path: Ruta del archivo KMZ
-            temp_dir: Directorio temporal
             
         Returns:
-            Lista de tuplas (nombre, descripción, lon, lat)
+            GeoDataFrame con las geometrías del KML
         """
+        import geopandas as gpd
+        
         try:
-            # Extraer KML
-            kml_path = extract_kmz_to_kml(kmz_path, temp_dir)
+            return gpd.read_file(kml_vsi_path(kmz_path), driver='KML')
+        except Exception as e:
+            logger.debug(f"Lectura /vsizip/ no disponible, usando flujo: {e}")
+            with open_kml_from_kmz(kmz_path) as kml:
+                return gpd.read_file(kml, driver='KML')
+    
+    def _get_utm_crs(self, gdf):
+        """
+        Obtiene el CRS UTM de un GeoDataFrame geográfico.
+        
+        El resultado se guarda por extensión redondeada a 1° para que
+        buffers sucesivos sobre capas similares no repitan la estimación.
+        
+        Args:
+            gdf: GeoDataFrame en coordenadas geográficas
             
-            # Parsear XML
-            with open(kml_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        Returns:
+            CRS UTM estimado
+        """
+        key = tuple(int(v) for v in np.round(gdf.total_bounds))
+        if key not in self._utm_crs_cache:
+            self._utm_crs_cache[key] = gdf.estimate_utm_crs()
+        return self._utm_crs_cache[key]
+    
+    def _extract_coordinates_from_kmz(self, kmz_path: str) -> List[Tuple[str, str, float, float]]:
+        """
+        Extrae coordenadas de un archivo KMZ.
+        
+        Args:
+            kmz_path: Ruta del archivo KMZ
             
-            tree = ET.ElementTree(ET.fromstring(content))
-            root = tree.getroot()
+        Returns:
+            Lista de tuplas (nombre, descripción, lon, lat)
+        """
+        names, descriptions, lons, lats = self._extract_coordinate_arrays(kmz_path)
+        return list(zip(names.tolist(), descriptions.tolist(), lons.tolist(), lats.tolist()))
+    
+    def _extract_coordinate_arrays(self, kmz_path: str) -> Tuple[np.ndarray, np.ndarray,
+                                                                np.ndarray, np.ndarray]:
+        """
+        Extrae coordenadas de un archivo KMZ como arreglos paralelos.
+        
+        Evita construir una tupla por punto: los arreglos pasan directo a la
+        reproyección vectorizada y a las columnas del DataFrame.
+        
+        Args:
+            kmz_path: Ruta del archivo KMZ
             
-            # Namespace KML
-            ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+        Returns:
+            Tupla de arreglos (nombres, descripciones, lons, lats) con los
+            puntos válidos
+        """
+        try:
+            names, descriptions, coord_texts = [], [], []
+            
+            # Recorrer el KML en streaming desde el KMZ, un Placemark a la vez
+            with open_kml_from_kmz(kmz_path) as kml:
+                for placemark in self._iter_placemarks(kml):
+                    fields = self._parse_placemark(placemark)
+                    if fields is not None:
+                        names.append(fields[0])
+                        descriptions.append(fields[1])
+                        coord_texts.append(fields[2])
+            
+            names = np.asarray(names, dtype=object)
+            descriptions = np.asarray(descriptions, dtype=object)
+            if not coord_texts:
+                return names, descriptions, np.empty(0), np.empty(0)
+            
+            # Convertir todos los textos de coordenadas de una vez
+            lons, lats = self._parse_coordinate_texts(coord_texts)
+            valid = np.isfinite(lons) & np.isfinite(lats)
+            if valid.all():
+                return names, descriptions, lons, lats
+            
+            for pos in np.flatnonzero(~valid):
+                logger.warning(f"Coordenadas inválidas en {names[pos]}")
+            return names[valid], descriptions[valid], lons[valid], lats[valid]
             
-            coordinates = []
-            placemarks = root.findall('.//kml:Placemark', ns)
+        except Exception as e:
+            logger.error(f"Error extrayendo coordenadas de KMZ: {e}")
+            raise
+    
+    def _iter_placemarks(self, kml) -> Iterator[ET.Element]:
+        """
+        Recorre los Placemarks de un KML sin construir el árbol completo.
+        
+        Args:
+            kml: Archivo KML abierto en modo binario
             
-            for placemark in placemarks:
-                # Obtener nombre
-                name_elem = placemark.find('kml:name', ns)
-                name = name_elem.text if name_elem is not None else "Sin Nombre"
+        Yields:
+            Elementos Placemark completos (se liberan al avanzar al siguiente)
+        """
+        if HAS_LXML:
+            # El filtro por tag se evalúa en C dentro de libxml2
+            for _, elem in ET.iterparse(kml, events=('end',), tag=PLACEMARK_TAG,
+                                        resolve_entities=False):
+                yield elem
                 
-                # Obtener descripción
-                desc_elem = placemark.find('kml:description', ns)
-                description = desc_elem.text if desc_elem is not None else ""
+                # Liberar el Placemark y los hermanos ya procesados
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        else:
+            parents = []
+            for event, elem in ET.iterparse(kml, events=('start', 'end')):
+                if event == 'start':
+                    parents.append(elem)
+                    continue
                 
-                # Buscar coordenadas en Point
-                point_elem = placemark.find('.//kml:Point', ns)
-                if point_elem is not None:
-                    coords_elem = point_elem.find('kml:coordinates', ns)
-                    if coords_elem is not None and coords_elem.text:
-                        coord_text = coords_elem.text.strip()
-                        parts = coord_text.split(',')
-                        if len(parts) >= 2:
-                            try:
-                                lon = float(parts[0])
-                                lat = float(parts[1])
-                                coordinates.append((name, description, lon, lat))
-                            except ValueError:
-                                logger.warning(f"Coordenadas inválidas en {name}")
-                                continue
-            
-            return coordinates
+                parents.pop()
+                if elem.tag == PLACEMARK_TAG:
+                    yield elem
+                    
+                    # Desprender el Placemark del árbol para liberarlo
+                    if parents:
+                        parents[-1].remove(elem)
+    
+    def _parse_placemark(self, placemark: ET.Element) -> Optional[Tuple[str, str, str]]:
+        """
+        Obtiene nombre, descripción y texto de coordenadas de un Placemark con Point.
+        
+        Args:
+            placemark: Elemento Placemark
             
-        except Exception as e:
-            logger.error(f"Error extrayendo coordenadas de KMZ: {e}")
-            raise
+        Returns:
+            Tupla (nombre, descripción, coordenadas) o None si no es un punto
+        """
+        if HAS_LXML:
+            # Las consultas precompiladas devuelven el texto directamente
+            names = XPATH_NAME(placemark)
+            name = names[0] if names else "Sin Nombre"
+            
+            descriptions = XPATH_DESCRIPTION(placemark)
+            description = descriptions[0] if descriptions else ""
+            
+            coords = XPATH_POINT_COORDS(placemark)
+            coord_text = coords[0] if coords else None
+        else:
+            ns = KML_NS
+            
+            # Obtener nombre
+            name_elem = placemark.find('kml:name', ns)
+            name = name_elem.text if name_elem is not None else "Sin Nombre"
+            
+            # Obtener descripción
+            desc_elem = placemark.find('kml:description', ns)
+            description = desc_elem.text if desc_elem is not None else ""
+            
+            # Buscar coordenadas en Point
+            coords_elem = placemark.find('.//kml:Point/kml:coordinates', ns)
+            coord_text = coords_elem.text if coords_elem is not None else None
+        
+        if coord_text and not coord_text.isspace():
+            return (name, description, coord_text)
+        
+        return None
+    
+    def _parse_coordinate_texts(self, coord_texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convierte textos "lon,lat[,alt]" en arreglos de longitudes y latitudes.
+        
+        Los textos se unen en una sola cadena que NumPy convierte en una
+        pasada; la cantidad de comas de cada texto indica dónde empieza cada
+        punto. Si algún texto no sigue el formato, se interpreta uno por uno.
+        
+        Args:
+            coord_texts: Textos de <coordinates> de cada Point
+            
+        Returns:
+            Tupla de arreglos (lons, lats), con NaN en los textos inválidos
+        """
+        counts = np.fromiter((text.count(',') + 1 for text in coord_texts),
+                             dtype=np.intp, count=len(coord_texts))
+        try:
+            values = np.array(",".join(coord_texts).split(','), dtype=np.float64)
+        except ValueError:
+            return self._parse_coordinate_texts_slow(coord_texts)
+        
+        starts = np.cumsum(counts) - counts
+        lons = values[starts]
+        lats = np.full(len(coord_texts), np.nan)
+        has_lat = counts >= 2
+        lats[has_lat] = values[starts[has_lat] + 1]
+        return lons, lats
+    
+    def _parse_coordinate_texts_slow(self, coord_texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Interpreta cada texto de coordenadas por separado."""
+        lons = np.full(len(coord_texts), np.nan)
+        lats = np.full(len(coord_texts), np.nan)
+        for i, coord_text in enumerate(coord_texts):
+            parts = COORD_SEPARATOR_RE.split(coord_text.strip())
+            if len(parts) >= 2:
+                try:
+                    lons[i] = float(parts[0])
+                    lats[i] = float(parts[1])
+                except ValueError:
+                    pass
+        return lons, lats
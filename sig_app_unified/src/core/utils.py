@@ -5,15 +5,55 @@ Funciones comunes para validación, conversión y manejo de archivos.
 """
 
 import os
+import shutil
 import zipfile
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple, List
-import geopandas as gpd
-from pyproj import Transformer, CRS
-from shapely.geometry import Point
+from typing import Optional, Tuple, List, Sequence, IO, Iterator, Union, TYPE_CHECKING
+import numpy as np
 from .config import logger, DEFAULT_CRS, SUPPORTED_FORMATS
 
+# Tamaño (bytes) bajo el cual el KML se guarda sin comprimir en el KMZ
+KMZ_STORE_THRESHOLD = 8192
+
+# Nivel de deflate del KMZ: el nivel 1 comprime en la mitad de tiempo que el
+# nivel por defecto (6) y el KML resultante pesa apenas un ~2% más
+KMZ_COMPRESSLEVEL = 1
+
+# Puntos mínimos por hilo al reproyectar en paralelo
+PARALLEL_TRANSFORM_CHUNK = 50_000
+
+# Transformers propios de cada hilo de reproyección. Los hilos son los del
+# ejecutor persistente de abajo, así que cada Transformer se reutiliza
+_thread_local = threading.local()
+
+# Ejecutor para la reproyección en paralelo, creado con el primer arreglo grande
+_TRANSFORM_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+# geopandas, shapely y pyproj se importan al primer uso para no cargarlos
+# durante el arranque de la interfaz
+if TYPE_CHECKING:
+    import geopandas as gpd
+    from pyproj import CRS, Transformer
+
+def available_cpus() -> int:
+    """
+    Cantidad de CPUs que el proceso puede usar.
+    
+    A diferencia de os.cpu_count(), respeta la afinidad del proceso (por
+    ejemplo, los límites de un contenedor), para no crear más hilos de los
+    que pueden ejecutarse a la vez.
+    
+    Returns:
+        Número de CPUs disponibles (al menos 1)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
 def validate_file_exists(file_path: str) -> bool:
     """
     Valida que un archivo exista.
@@ -24,7 +64,11 @@ def validate_file_exists(file_path: str) -> bool:
     Returns:
         True si el archivo existe, False en caso contrario
     """
-    return os.path.exists(file_path) and os.path.isfile(file_path)
+    # Una sola llamada a stat(): is_file() retorna False si la ruta no existe
+    try:
+        return Path(file_path).is_file()
+    except OSError:
+        return False
 
 def validate_file_format(file_path: str, expected_formats: List[str]) -> bool:
     """
@@ -43,49 +87,86 @@ def validate_file_format(file_path: str, expected_formats: List[str]) -> bool:
     file_ext = Path(file_path).suffix.lower()
     return file_ext in expected_formats
 
-def extract_kmz_to_kml(kmz_path: str, temp_dir: Optional[str] = None) -> str:
+def _find_kml_entry(kmz: zipfile.ZipFile) -> str:
     """
-    Extrae el archivo KML de un KMZ.
+    Busca la primera entrada KML dentro de un KMZ abierto.
     
     Args:
-        kmz_path: Ruta del archivo KMZ
-        temp_dir: Directorio temporal (opcional)
+        kmz: Archivo KMZ abierto
         
     Returns:
-        Ruta del archivo KML extraído
+        Nombre de la entrada KML
         
     Raises:
         ValueError: Si no se encuentra archivo KML en el KMZ
     """
-    if temp_dir is None:
-        temp_dir = tempfile.mkdtemp()
+    kml_name = next((name for name in kmz.namelist() if name.lower().endswith('.kml')), None)
+    if kml_name is None:
+        raise ValueError("No se encontró archivo KML dentro del KMZ")
+    return kml_name
+
+@contextmanager
+def open_kml_from_kmz(kmz_path: str) -> Iterator[IO[bytes]]:
+    """
+    Abre el KML de un KMZ como flujo binario, descomprimiendo bajo demanda.
     
-    try:
-        with zipfile.ZipFile(kmz_path, 'r') as kmz:
-            kmz.extractall(temp_dir)
+    El flujo de ZipFile.open ya es un lector con búfer que descomprime por
+    bloques, así que se entrega tal cual al parser sin envolverlo en otro
+    BufferedReader (no reduce el tiempo de iterparse).
+    
+    Args:
+        kmz_path: Ruta del archivo KMZ
         
-        # Buscar archivo KML
-        kml_files = [f for f in os.listdir(temp_dir) if f.endswith('.kml')]
-        if not kml_files:
-            raise ValueError("No se encontró archivo KML dentro del KMZ")
+    Yields:
+        Archivo binario de solo lectura con el contenido del KML
         
-        return os.path.join(temp_dir, kml_files[0])
+    Raises:
+        ValueError: Si no se encuentra archivo KML en el KMZ
+    """
+    with zipfile.ZipFile(kmz_path, 'r') as kmz:
+        with kmz.open(_find_kml_entry(kmz)) as kml:
+            yield kml
+
+def kml_vsi_path(kmz_path: str) -> str:
+    """
+    Construye la ruta GDAL /vsizip/ del KML dentro de un KMZ.
     
-    except Exception as e:
-        logger.error(f"Error extrayendo KMZ: {e}")
-        raise
+    GDAL lee la entrada directamente desde el ZIP, sin extraerla.
+    
+    Args:
+        kmz_path: Ruta del archivo KMZ
+        
+    Returns:
+        Ruta virtual del KML (p. ej. "/vsizip//datos/capa.kmz/doc.kml")
+        
+    Raises:
+        ValueError: Si no se encuentra archivo KML en el KMZ
+    """
+    with zipfile.ZipFile(kmz_path, 'r') as kmz:
+        kml_name = _find_kml_entry(kmz)
+    return f"/vsizip/{os.path.abspath(kmz_path)}/{kml_name}"
 
-def create_kmz_from_kml(kml_path: str, kmz_path: str) -> None:
+def write_kmz(kml_bytes: bytes, kmz_path: str, entry_name: str = "doc.kml") -> None:
     """
-    Crea un archivo KMZ a partir de un KML.
+    Crea un archivo KMZ a partir del contenido KML ya serializado.
+    
+    El KML se escribe directamente dentro del ZIP, sin pasar por un archivo
+    temporal en disco.
     
     Args:
-        kml_path: Ruta del archivo KML
+        kml_bytes: Contenido del KML codificado en UTF-8
         kmz_path: Ruta de salida del KMZ
+        entry_name: Nombre del KML dentro del KMZ
     """
     try:
-        with zipfile.ZipFile(kmz_path, 'w', zipfile.ZIP_DEFLATED) as kmz:
-            kmz.write(kml_path, os.path.basename(kml_path))
+        # Para KML pequeños el costo de zlib supera el ahorro de espacio
+        if len(kml_bytes) > KMZ_STORE_THRESHOLD:
+            compression = zipfile.ZIP_DEFLATED
+        else:
+            compression = zipfile.ZIP_STORED
+        
+        with zipfile.ZipFile(kmz_path, 'w', compression, compresslevel=KMZ_COMPRESSLEVEL) as kmz:
+            kmz.writestr(entry_name, kml_bytes)
         logger.info(f"KMZ creado: {kmz_path}")
     except Exception as e:
         logger.error(f"Error creando KMZ: {e}")
@@ -116,7 +197,7 @@ def estimate_utm_crs(lon: float, lat: float) -> str:
     
     return epsg_code
 
-def auto_detect_crs(gdf: gpd.GeoDataFrame) -> str:
+def auto_detect_crs(gdf: "gpd.GeoDataFrame") -> "CRS":
     """
     Auto-detecta el mejor CRS UTM para un GeoDataFrame.
     
@@ -124,7 +205,7 @@ def auto_detect_crs(gdf: gpd.GeoDataFrame) -> str:
         gdf: GeoDataFrame con geometrías
         
     Returns:
-        Código EPSG del CRS recomendado
+        CRS recomendado
     """
     try:
         if gdf.crs is None or gdf.crs.is_geographic:
@@ -133,32 +214,179 @@ def auto_detect_crs(gdf: gpd.GeoDataFrame) -> str:
             center_lon = (bounds[0] + bounds[2]) / 2
             center_lat = (bounds[1] + bounds[3]) / 2
             
-            return estimate_utm_crs(center_lon, center_lat)
+            return get_crs(estimate_utm_crs(center_lon, center_lat))
         else:
-            return gdf.crs.to_string()
+            return gdf.crs
     except Exception as e:
         logger.warning(f"Error auto-detectando CRS: {e}")
-        return DEFAULT_CRS["utm_chile"]
+        return get_crs(DEFAULT_CRS["utm_chile"])
+
+CRSLike = Union[str, "CRS"]
+
+@lru_cache(maxsize=128)
+def get_crs(crs: CRSLike) -> "CRS":
+    """
+    Obtiene un objeto CRS, resolviendo cada código una sola vez.
+    
+    Args:
+        crs: Código (p. ej. "EPSG:32719") u objeto CRS
+        
+    Returns:
+        Objeto pyproj.CRS
+    """
+    from pyproj import CRS
+    return CRS.from_user_input(crs)
+
+@lru_cache(maxsize=64)
+def same_crs(crs_a: CRSLike, crs_b: CRSLike) -> bool:
+    """
+    Indica si dos CRS son equivalentes (sin considerar el orden de ejes).
+    
+    Args:
+        crs_a, crs_b: CRS a comparar (código u objeto CRS)
+        
+    Returns:
+        True si la transformación entre ambos es la identidad
+    """
+    return crs_a == crs_b or get_crs(crs_a).equals(get_crs(crs_b), ignore_axis_order=True)
 
-def convert_coordinates(x: float, y: float, from_crs: str, to_crs: str) -> Tuple[float, float]:
+@lru_cache(maxsize=64)
+def get_transformer(from_crs: CRSLike, to_crs: CRSLike) -> "Transformer":
+    """
+    Obtiene un Transformer entre dos CRS, reutilizando instancias previas.
+    
+    Construir un Transformer consulta la base de datos de PROJ, por lo que
+    se memoiza por par (from_crs, to_crs).
+    
+    Args:
+        from_crs: CRS de origen (código u objeto CRS)
+        to_crs: CRS de destino (código u objeto CRS)
+        
+    Returns:
+        Transformer con orden de ejes (x, y)
+    """
+    from pyproj import Transformer
+    return Transformer.from_crs(get_crs(from_crs), get_crs(to_crs), always_xy=True)
+
+def _get_transform_executor() -> ThreadPoolExecutor:
+    """Obtiene el ejecutor de reproyección, creándolo la primera vez."""
+    global _TRANSFORM_EXECUTOR
+    if _TRANSFORM_EXECUTOR is None:
+        _TRANSFORM_EXECUTOR = ThreadPoolExecutor(max_workers=available_cpus(),
+                                                 thread_name_prefix="sig-proj")
+    return _TRANSFORM_EXECUTOR
+
+def _get_thread_transformer(from_crs: CRSLike, to_crs: CRSLike) -> "Transformer":
+    """Obtiene un Transformer exclusivo del hilo actual."""
+    transformers = getattr(_thread_local, "transformers", None)
+    if transformers is None:
+        transformers = _thread_local.transformers = {}
+    
+    key = (from_crs, to_crs)
+    if key not in transformers:
+        from pyproj import Transformer
+        transformers[key] = Transformer.from_crs(get_crs(from_crs), get_crs(to_crs), always_xy=True)
+    return transformers[key]
+
+def convert_coordinates(x: float, y: float, from_crs: CRSLike, to_crs: CRSLike) -> Tuple[float, float]:
     """
     Convierte coordenadas entre sistemas de referencia.
     
     Args:
         x, y: Coordenadas de entrada
-        from_crs: CRS de origen
-        to_crs: CRS de destino
+        from_crs: CRS de origen (código u objeto CRS)
+        to_crs: CRS de destino (código u objeto CRS)
         
     Returns:
         Tupla con coordenadas convertidas (x, y)
     """
     try:
-        transformer = Transformer.from_crs(from_crs, to_crs, always_xy=True)
+        if same_crs(from_crs, to_crs):
+            return x, y
+        transformer = get_transformer(from_crs, to_crs)
         return transformer.transform(x, y)
     except Exception as e:
         logger.error(f"Error convirtiendo coordenadas: {e}")
         raise
 
+def convert_coordinates_bulk(xs: Sequence[float], ys: Sequence[float],
+                             from_crs: CRSLike, to_crs: CRSLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte arreglos de coordenadas entre sistemas de referencia.
+    
+    Todas las coordenadas se envían a PROJ en una sola llamada, evitando
+    el costo por punto de convert_coordinates. Con al menos dos bloques de
+    PARALLEL_TRANSFORM_CHUNK puntos la reproyección se reparte entre hilos;
+    si ambos CRS son equivalentes no se llama a PROJ. Se usa la verificación
+    por defecto de pyproj (errcheck=False): los puntos que PROJ no puede
+    transformar quedan como inf en lugar de lanzar una excepción.
+    
+    Args:
+        xs, ys: Secuencias de coordenadas de entrada
+        from_crs: CRS de origen (código u objeto CRS)
+        to_crs: CRS de destino (código u objeto CRS)
+        
+    Returns:
+        Tupla de arreglos NumPy con coordenadas convertidas (xs, ys)
+    """
+    try:
+        # Copia propia que PROJ sobrescribe en el lugar (inplace=True), sin
+        # arreglos de salida adicionales
+        xs = np.array(xs, dtype=np.float64)
+        ys = np.array(ys, dtype=np.float64)
+        
+        # Mismo CRS: no hay nada que transformar
+        if same_crs(from_crs, to_crs):
+            return xs, ys
+        
+        workers = min(available_cpus(), len(xs) // PARALLEL_TRANSFORM_CHUNK)
+        if workers <= 1:
+            get_transformer(from_crs, to_crs).transform(xs, ys, inplace=True)
+            return xs, ys
+        
+        # pyproj libera el GIL durante la transformación, así que los bloques
+        # (vistas de la misma copia) se reproyectan en paralelo con un
+        # Transformer por hilo, conservado entre llamadas
+        def transform_chunk(chunk):
+            _get_thread_transformer(from_crs, to_crs).transform(*chunk, inplace=True)
+        
+        chunks = zip(np.array_split(xs, workers), np.array_split(ys, workers))
+        list(_get_transform_executor().map(transform_chunk, chunks))
+        
+        return xs, ys
+    except Exception as e:
+        logger.error(f"Error convirtiendo coordenadas: {e}")
+        raise
+
+def transform_geometries(geometries: np.ndarray, from_crs: CRSLike, to_crs: CRSLike) -> np.ndarray:
+    """
+    Reproyecta un arreglo de geometrías 2D con una sola pasada por PROJ.
+    
+    shapely reúne los vértices de todas las geometrías en un solo arreglo y
+    las reconstruye con los desplazamientos originales, de modo que PROJ
+    recibe todas las coordenadas juntas (vía convert_coordinates_bulk). Si
+    ambos CRS son equivalentes las geometrías se devuelven sin reconstruir.
+    
+    Args:
+        geometries: Arreglo de geometrías shapely
+        from_crs: CRS de origen (código u objeto CRS)
+        to_crs: CRS de destino (código u objeto CRS)
+        
+    Returns:
+        Arreglo NumPy de geometrías reproyectadas
+    """
+    geometries = np.asarray(geometries)
+    if same_crs(from_crs, to_crs):
+        return geometries
+    
+    import shapely
+    
+    def transform_coords(coords):
+        xs, ys = convert_coordinates_bulk(coords[:, 0], coords[:, 1], from_crs, to_crs)
+        return np.column_stack((xs, ys))
+    
+    return shapely.transform(geometries, transform_coords)
+
 def validate_coordinates(lon: float, lat: float) -> bool:
     """
     Valida que las coordenadas estén en rangos válidos.
@@ -226,9 +454,28 @@ def clean_temp_files(temp_dir: str) -> None:
         temp_dir: Directorio temporal a limpiar
     """
     try:
-        import shutil
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-            logger.debug(f"Directorio temporal limpiado: {temp_dir}")
+        # Los directorios temporales son planos (un KML y pocos recursos):
+        # una pasada de scandir evita el recorrido genérico de shutil.rmtree
+        with os.scandir(temp_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+        os.rmdir(temp_dir)
+        logger.debug(f"Directorio temporal limpiado: {temp_dir}")
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.warning(f"Error limpiando archivos temporales: {e}")
+
+def clean_temp_dirs(temp_dirs: List[str]) -> None:
+    """
+    Limpia una lista de directorios temporales y la vacía.
+    
+    Args:
+        temp_dirs: Lista de directorios temporales (se modifica en el lugar)
+    """
+    for temp_dir in temp_dirs:
+        clean_temp_files(temp_dir)
+    temp_dirs.clear()
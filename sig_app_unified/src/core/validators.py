@@ -3,13 +3,19 @@
 Validadores para datos de entrada de la aplicación SIG.
 """
 
-import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union, TYPE_CHECKING
+import numpy as np
 import pandas as pd
-import geopandas as gpd
 from .config import logger, SUPPORTED_FORMATS
 from .utils import validate_file_exists, validate_coordinates
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+# Límites absolutos de coordenadas (cubren geográficas y UTM)
+MAX_ABS_EASTING = 1_000_000
+MAX_ABS_NORTHING = 10_000_000
+
 class ValidationError(Exception):
     """Excepción personalizada para errores de validación."""
     pass
@@ -72,16 +78,11 @@ class FileValidator:
         
         # Validar contenido GPX básico
         try:
-            import gpxpy
-            with open(file_path, 'r', encoding='utf-8') as f:
-                gpx = gpxpy.parse(f)
-                
-            # Verificar que tenga contenido
-            has_content = (len(gpx.tracks) > 0 or 
-                          len(gpx.routes) > 0 or 
-                          len(gpx.waypoints) > 0)
+            # Basta con encontrar el primer elemento; el parseo completo lo
+            # hace (y guarda en caché) el procesador
+            from .gpx_processor import gpx_has_items
             
-            if not has_content:
+            if not gpx_has_items(file_path):
                 raise ValidationError("El archivo GPX no contiene tracks, rutas o waypoints")
                 
         except Exception as e:
@@ -111,13 +112,29 @@ class FileValidator:
             raise ValidationError("El archivo debe ser .xlsx o .xls")
         
         try:
-            df = pd.read_excel(file_path)
+            if file_path.lower().endswith('.xlsx'):
+                # Leer solo encabezados y primera fila de datos (modo read_only).
+                # Se usa la primera hoja, igual que pd.read_excel, y no la activa
+                import openpyxl
+                wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+                try:
+                    rows = list(wb.worksheets[0].iter_rows(max_row=2, values_only=True))
+                finally:
+                    wb.close()
+                
+                headers = [value for value in rows[0] if value is not None] if rows else []
+                is_empty = len(rows) < 2
+            else:
+                # openpyxl no soporta .xls, se usa pandas
+                df = pd.read_excel(file_path)
+                headers = list(df.columns)
+                is_empty = df.empty
             
-            if df.empty:
+            if is_empty:
                 raise ValidationError("El archivo Excel está vacío")
             
             if required_columns:
-                missing_cols = set(required_columns) - set(df.columns)
+                missing_cols = set(required_columns) - set(headers)
                 if missing_cols:
                     raise ValidationError(f"Faltan columnas requeridas: {missing_cols}")
                     
@@ -156,21 +173,53 @@ class DataValidator:
         if errors:
             return errors
         
-        # Validar valores numéricos
-        for idx, row in df.iterrows():
-            try:
-                lon = float(row[lon_col])
-                lat = float(row[lat_col])
-                
-                # Validar rangos (asumiendo coordenadas geográficas o UTM)
-                if abs(lon) > 1000000 or abs(lat) > 10000000:
-                    errors.append(f"Fila {idx+1}: Coordenadas fuera de rango válido")
-                
-            except (ValueError, TypeError):
-                errors.append(f"Fila {idx+1}: Coordenadas no numéricas")
+        # Validar valores numéricos (vectorizado por columnas)
+        lon = pd.to_numeric(df[lon_col], errors='coerce').to_numpy(dtype=np.float64)
+        lat = pd.to_numeric(df[lat_col], errors='coerce').to_numpy(dtype=np.float64)
+        
+        # Validar rangos (asumiendo coordenadas geográficas o UTM); las
+        # comparaciones con NaN son falsas, así que un solo paso por columna
+        # detecta tanto valores no numéricos como fuera de rango
+        valid = (np.abs(lon) <= MAX_ABS_EASTING) & (np.abs(lat) <= MAX_ABS_NORTHING)
+        
+        for pos in np.flatnonzero(~valid):
+            if np.isnan(lon[pos]) or np.isnan(lat[pos]):
+                errors.append(f"Fila {pos+1}: Coordenadas no numéricas")
+            else:
+                errors.append(f"Fila {pos+1}: Coordenadas fuera de rango válido")
         
         return errors
     
+    @staticmethod
+    def parse_buffer_distance(distance: str) -> Tuple[bool, Union[float, str]]:
+        """
+        Convierte y valida distancia de buffer sin lanzar excepciones.
+        
+        Pensado para callbacks de validación de Tk, que se ejecutan en
+        cada pulsación de tecla.
+        
+        Args:
+            distance: Distancia como string
+            
+        Returns:
+            Tupla (True, distancia) si es válida, o (False, mensaje de error)
+        """
+        try:
+            dist = float(distance.replace(',', '.'))
+        except (ValueError, AttributeError):
+            return False, "La distancia debe ser un número válido"
+        
+        if not np.isfinite(dist):
+            return False, "La distancia debe ser un número válido"
+        
+        if dist <= 0:
+            return False, "La distancia debe ser mayor que 0"
+        
+        if dist > 100000:  # 100 km máximo
+            return False, "La distancia máxima es 100,000 metros"
+        
+        return True, dist
+    
     @staticmethod
     def validate_buffer_distance(distance: str) -> float:
         """
@@ -185,22 +234,13 @@ class DataValidator:
         Raises:
             ValidationError: Si la distancia no es válida
         """
-        try:
-            dist = float(distance.replace(',', '.'))
-            
-            if dist <= 0:
-                raise ValidationError("La distancia debe ser mayor que 0")
-            
-            if dist > 100000:  # 100 km máximo
-                raise ValidationError("La distancia máxima es 100,000 metros")
-            
-            return dist
-            
-        except ValueError:
-            raise ValidationError("La distancia debe ser un número válido")
+        is_valid, result = DataValidator.parse_buffer_distance(distance)
+        if not is_valid:
+            raise ValidationError(result)
+        return result
     
     @staticmethod
-    def validate_geodataframe(gdf: gpd.GeoDataFrame) -> List[str]:
+    def validate_geodataframe(gdf: "gpd.GeoDataFrame") -> List[str]:
         """
         Valida un GeoDataFrame.
         
@@ -216,8 +256,12 @@ class DataValidator:
             issues.append("ERROR: GeoDataFrame vacío")
             return issues
         
+        # Arreglo de geometrías shapely para predicados vectorizados
+        import shapely
+        geoms = np.asarray(gdf.geometry.values)
+        
         # Verificar geometrías válidas
-        invalid_geoms = gdf.geometry.isna().sum()
+        invalid_geoms = int(np.count_nonzero(shapely.is_missing(geoms)))
         if invalid_geoms > 0:
             issues.append(f"ADVERTENCIA: {invalid_geoms} geometrías inválidas")
         
@@ -226,7 +270,7 @@ class DataValidator:
             issues.append("ADVERTENCIA: Sin sistema de coordenadas definido")
         
         # Verificar geometrías vacías
-        empty_geoms = gdf.geometry.is_empty.sum()
+        empty_geoms = int(np.count_nonzero(shapely.is_empty(geoms)))
         if empty_geoms > 0:
             issues.append(f"ADVERTENCIA: {empty_geoms} geometrías vacías")
         
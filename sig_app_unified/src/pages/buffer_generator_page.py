@@ -4,10 +4,10 @@ Página para generar buffers en archivos KMZ.
 """
 
 import tkinter as tk
-from tkinter import filedialog, ttk
-import threading
+from tkinter import filedialog
 import sys
 import os
+from functools import partial
 
 # Agregar el directorio src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -15,9 +15,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.ui.base_window import BaseWindow
 from src.core.kmz_processor import KMZProcessor
 from src.core.validators import InputValidator, ValidationError, DataValidator
-from src.core.config import logger, BUFFER_CONFIG
+from src.core.config import logger, UI_COLORS, BUFFER_CONFIG
 from src.core.utils import format_distance
 
+# Fondo de la página, resuelto una vez para todos los widgets
+PAGE_BG = UI_COLORS["bg_primary"]
+
 class BufferGeneratorPage(BaseWindow):
     """Página para generar buffers en KMZ."""
     
@@ -64,7 +67,7 @@ class BufferGeneratorPage(BaseWindow):
         self._create_advanced_options_frame()
         
         # Botones de acción
-        button_frame = tk.Frame(self.main_frame, bg=self.root.cget("bg"))
+        button_frame = tk.Frame(self.main_frame, bg=PAGE_BG)
         button_frame.grid(row=6, column=0, columnspan=3, pady=20)
         
         self.create_action_button(
@@ -97,7 +100,7 @@ class BufferGeneratorPage(BaseWindow):
             self.main_frame,
             text="Configuración del Buffer",
             font=("Helvetica", 12, "bold"),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#E4610F",
             padx=15,
             pady=10
@@ -109,10 +112,10 @@ class BufferGeneratorPage(BaseWindow):
             config_frame,
             text="Distancia del buffer (metros):",
             font=("Helvetica", 11),
-            bg=self.root.cget("bg")
+            bg=PAGE_BG
         ).grid(row=0, column=0, sticky="w", padx=5, pady=5)
         
-        distance_frame = tk.Frame(config_frame, bg=self.root.cget("bg"))
+        distance_frame = tk.Frame(config_frame, bg=PAGE_BG)
         distance_frame.grid(row=0, column=1, sticky="w", padx=10, pady=5)
         
         distance_entry = tk.Entry(
@@ -132,7 +135,7 @@ class BufferGeneratorPage(BaseWindow):
             btn = tk.Button(
                 distance_frame,
                 text=format_distance(dist),
-                command=lambda d=dist: self.buffer_distance.set(str(d)),
+                command=partial(self.buffer_distance.set, str(dist)),
                 bg="#F0F0F0",
                 fg="#333333",
                 font=("Helvetica", 9),
@@ -148,7 +151,7 @@ class BufferGeneratorPage(BaseWindow):
             config_frame,
             text=f"Rango válido: {BUFFER_CONFIG['min_distance']} - {format_distance(BUFFER_CONFIG['max_distance'])}",
             font=("Helvetica", 9),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#666666"
         )
         range_label.grid(row=1, column=0, columnspan=2, sticky="w", padx=5, pady=(0, 5))
@@ -159,7 +162,7 @@ class BufferGeneratorPage(BaseWindow):
             self.main_frame,
             text="Opciones Avanzadas",
             font=("Helvetica", 12, "bold"),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#E4610F",
             padx=15,
             pady=10
@@ -172,8 +175,8 @@ class BufferGeneratorPage(BaseWindow):
             text="Combinar todos los buffers en un solo polígono",
             variable=self.combine_buffers,
             font=("Helvetica", 11),
-            bg=self.root.cget("bg"),
-            activebackground=self.root.cget("bg")
+            bg=PAGE_BG,
+            activebackground=PAGE_BG
         )
         combine_cb.grid(row=0, column=0, sticky="w", pady=5)
         
@@ -182,7 +185,7 @@ class BufferGeneratorPage(BaseWindow):
             options_frame,
             text="• Activado: Crea un único polígono que une todos los buffers\n• Desactivado: Mantiene buffers individuales junto con geometrías originales",
             font=("Helvetica", 9),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#666666",
             justify=tk.LEFT
         )
@@ -206,7 +209,7 @@ Información sobre buffers:
             self.main_frame,
             text=help_text,
             font=("Helvetica", 10),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#666666",
             justify=tk.LEFT
         )
@@ -217,15 +220,13 @@ Información sobre buffers:
         if not value:
             return True
         
-        try:
-            dist = float(value.replace(',', '.'))
-            return BUFFER_CONFIG["min_distance"] <= dist <= BUFFER_CONFIG["max_distance"]
-        except ValueError:
-            return False
+        is_valid, dist = DataValidator.parse_buffer_distance(value)
+        return is_valid and BUFFER_CONFIG["min_distance"] <= dist <= BUFFER_CONFIG["max_distance"]
     
     def _browse_input_file(self):
         """Abre diálogo para seleccionar archivo KMZ de entrada."""
         file_path = filedialog.askopenfilename(
+            parent=self.root,
             title="Seleccionar archivo KMZ",
             filetypes=[("Archivos KMZ", "*.kmz"), ("Todos los archivos", "*.*")]
         )
@@ -242,6 +243,7 @@ Información sobre buffers:
     def _browse_output_file(self):
         """Abre diálogo para seleccionar ubicación de archivo KMZ."""
         file_path = filedialog.asksaveasfilename(
+            parent=self.root,
             title="Guardar archivo KMZ como",
             defaultextension=".kmz",
             filetypes=[("Archivos KMZ", "*.kmz"), ("Todos los archivos", "*.*")]
@@ -252,12 +254,15 @@ Información sobre buffers:
     def _preview_geometries(self):
         """Muestra vista previa de las geometrías del KMZ."""
         try:
-            InputValidator.validate_file_path_input(self.input_file.get(), "kmz")
+            self.validate_input_file(self.input_file.get(), "kmz")
             
-            # Ejecutar vista previa en hilo separado
-            thread = threading.Thread(target=self._preview_geometries_thread)
-            thread.daemon = True
-            thread.start()
+            # Ejecutar vista previa en segundo plano
+            self.set_processing(True, "Analizando geometrías...")
+            self.run_background_task(
+                self._load_geometry_info,
+                self._on_preview_done,
+                self.input_file.get()
+            )
             
         except ValidationError as e:
             self.show_error(str(e))
@@ -265,38 +270,35 @@ Información sobre buffers:
             logger.error(f"Error iniciando vista previa: {e}")
             self.show_error(f"Error inesperado: {e}")
     
-    def _preview_geometries_thread(self):
-        """Ejecuta la vista previa en un hilo separado."""
+    def _load_geometry_info(self, input_path: str) -> dict:
+        """Lee el KMZ y resume sus geometrías (se ejecuta en segundo plano)."""
+        # Leer archivo KMZ en streaming, sin extraerlo a un directorio temporal
+        gdf = self.processor.read_kmz_geometries(input_path)
+        
+        # Analizar geometrías (un solo conteo por tipo)
+        type_counts = gdf.geom_type.value_counts()
+        return {
+            "total": len(gdf),
+            "points": int(type_counts.get('Point', 0) + type_counts.get('MultiPoint', 0)),
+            "lines": int(type_counts.get('LineString', 0) + type_counts.get('MultiLineString', 0)),
+            "polygons": int(type_counts.get('Polygon', 0) + type_counts.get('MultiPolygon', 0)),
+            "bounds": gdf.total_bounds if not gdf.empty else None,
+            "crs": str(gdf.crs) if gdf.crs else "No definido"
+        }
+    
+    def _on_preview_done(self, future):
+        """Muestra la vista previa de geometrías (en el hilo de Tk)."""
+        self.set_processing(False)
+        
         try:
-            self.root.after(0, lambda: self.set_processing(True, "Analizando geometrías..."))
-            
-            # Leer archivo KMZ
-            import tempfile
-            import geopandas as gpd
-            from core.utils import extract_kmz_to_kml
-            
-            temp_dir = tempfile.mkdtemp()
-            kml_path = extract_kmz_to_kml(self.input_file.get(), temp_dir)
-            gdf = gpd.read_file(kml_path, driver='KML')
-            
-            # Analizar geometrías
-            geom_info = {
-                "total": len(gdf),
-                "points": len(gdf[gdf.geometry.type.isin(['Point', 'MultiPoint'])]),
-                "lines": len(gdf[gdf.geometry.type.isin(['LineString', 'MultiLineString'])]),
-                "polygons": len(gdf[gdf.geometry.type.isin(['Polygon', 'MultiPolygon'])]),
-                "bounds": gdf.total_bounds if not gdf.empty else None,
-                "crs": str(gdf.crs) if gdf.crs else "No definido"
-            }
-            
-            # Mostrar ventana de vista previa
-            self.root.after(0, lambda: self._show_preview_window(geom_info))
-            
+            geom_info = future.result()
         except Exception as e:
             logger.error(f"Error en vista previa: {e}")
-            self.root.after(0, lambda: self.show_error(f"Error analizando geometrías: {e}"))
-        finally:
-            self.root.after(0, lambda: self.set_processing(False))
+            self.show_error(f"Error analizando geometrías: {e}")
+            return
+        
+        # Mostrar ventana de vista previa
+        self._show_preview_window(geom_info)
     
     def _show_preview_window(self, geom_info):
         """Muestra ventana con información de geometrías."""
@@ -391,19 +393,24 @@ Información sobre buffers:
         
         try:
             # Validar entradas
-            InputValidator.validate_file_path_input(self.input_file.get(), "kmz")
+            self.validate_input_file(self.input_file.get(), "kmz")
             output_path = InputValidator.validate_output_path(self.output_file.get(), ".kmz")
             
             # Validar distancia
             distance = DataValidator.validate_buffer_distance(self.buffer_distance.get())
             
-            # Ejecutar en hilo separado
-            thread = threading.Thread(
-                target=self._generate_buffer_thread,
-                args=(self.input_file.get(), output_path, distance)
+            # Ejecutar en segundo plano
+            combine = self.combine_buffers.get()
+            self.set_processing(True, f"Generando buffer de {format_distance(distance)}...")
+            self.run_process_task(
+                self.processor.apply_buffer_to_kmz,
+                partial(self._on_buffer_done, output_path=output_path,
+                        distance=distance, combine=combine),
+                self.input_file.get(),
+                output_path,
+                distance,
+                combine
             )
-            thread.daemon = True
-            thread.start()
             
         except ValidationError as e:
             self.show_error(str(e))
@@ -411,31 +418,22 @@ Información sobre buffers:
             logger.error(f"Error iniciando generación de buffer: {e}")
             self.show_error(f"Error inesperado: {e}")
     
-    def _generate_buffer_thread(self, input_path: str, output_path: str, distance: float):
-        """Ejecuta la generación de buffer en un hilo separado."""
+    def _on_buffer_done(self, future, output_path: str, distance: float, combine: bool):
+        """Muestra el resultado de la generación de buffer (en el hilo de Tk)."""
+        self.set_processing(False)
+        
         try:
-            self.root.after(0, lambda: self.set_processing(True, f"Generando buffer de {format_distance(distance)}..."))
-            
-            # Generar buffer
-            success = self.processor.apply_buffer_to_kmz(
-                input_path,
-                output_path,
-                distance,
-                self.combine_buffers.get()
-            )
-            
-            if success:
-                buffer_type = "combinado" if self.combine_buffers.get() else "individual"
-                message = f"Buffer {buffer_type} de {format_distance(distance)} generado exitosamente:\n{output_path}"
-                self.root.after(0, lambda: self.show_success(message))
-            else:
-                self.root.after(0, lambda: self.show_error("Error durante la generación del buffer"))
-                
+            success = future.result()
         except Exception as e:
             logger.error(f"Error en generación de buffer: {e}")
-            self.root.after(0, lambda: self.show_error(f"Error durante la generación: {e}"))
-        finally:
-            self.root.after(0, lambda: self.set_processing(False))
+            self.show_error(f"Error durante la generación: {e}")
+            return
+        
+        if success:
+            buffer_type = "combinado" if combine else "individual"
+            self.show_success(f"Buffer {buffer_type} de {format_distance(distance)} generado exitosamente:\n{output_path}")
+        else:
+            self.show_error("Error durante la generación del buffer")
     
     def _return_to_menu(self):
         """Regresa al menú principal."""
@@ -5,17 +5,29 @@ Página para crear archivos KMZ desde datos de Excel.
 
 import tkinter as tk
 from tkinter import filedialog, ttk
-import threading
 import sys
 import os
+from functools import partial
 
 # Agregar el directorio src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.ui.base_window import BaseWindow
-from src.core.kmz_processor import KMZProcessor
+from src.core.kmz_processor import KMZProcessor, read_excel
 from src.core.validators import InputValidator, ValidationError
-from src.core.config import logger, DEFAULT_CRS
+from src.core.config import logger, UI_COLORS, CRS_CHOICES
+
+# Fondo de la página, resuelto una vez para todos los widgets
+PAGE_BG = UI_COLORS["bg_primary"]
+
+# Filas mostradas en la vista previa
+PREVIEW_ROWS = 50
+
+# CRS de origen seleccionables: (etiqueta, CRS); el Radiobutton guarda el índice
+SOURCE_CRS_OPTIONS = tuple(CRS_CHOICES.items())
+
+# Lambda de Tcl que inserta una lista de filas en un Treeview
+_TREE_INSERT_ROWS = ("tree rows", "foreach row $rows {$tree insert {} end -values $row}")
 
 class ExcelToKMZPage(BaseWindow):
     """Página para crear KMZ desde Excel."""
@@ -67,7 +79,7 @@ class ExcelToKMZPage(BaseWindow):
         self._create_crs_config_frame()
         
         # Botones de acción
-        button_frame = tk.Frame(self.main_frame, bg=self.root.cget("bg"))
+        button_frame = tk.Frame(self.main_frame, bg=PAGE_BG)
         button_frame.grid(row=6, column=0, columnspan=3, pady=20)
         
         self.create_action_button(
@@ -100,7 +112,7 @@ class ExcelToKMZPage(BaseWindow):
             self.main_frame,
             text="Configuración de Columnas",
             font=("Helvetica", 12, "bold"),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#E4610F",
             padx=10,
             pady=10
@@ -124,7 +136,7 @@ class ExcelToKMZPage(BaseWindow):
                 config_frame,
                 text=label_text,
                 font=("Helvetica", 10),
-                bg=self.root.cget("bg")
+                bg=PAGE_BG
             ).grid(row=0, column=i, sticky="w", padx=5)
             
             entry = tk.Entry(
@@ -142,29 +154,23 @@ class ExcelToKMZPage(BaseWindow):
             self.main_frame,
             text="Sistema de Coordenadas de Origen",
             font=("Helvetica", 12, "bold"),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#E4610F",
             padx=10,
             pady=10
         )
         crs_frame.grid(row=4, column=0, columnspan=3, pady=15, sticky="ew", padx=20)
         
-        self.source_crs = tk.StringVar(value="UTM 19S (Chile)")
+        self.source_crs = tk.IntVar(value=0)
         
-        crs_options = [
-            "UTM 19S (Chile)",
-            "WGS84 (Geográficas)",
-            "Auto-detectar zona UTM"
-        ]
-        
-        for i, option in enumerate(crs_options):
+        for i, (option, _) in enumerate(SOURCE_CRS_OPTIONS):
             rb = tk.Radiobutton(
                 crs_frame,
                 text=option,
                 variable=self.source_crs,
-                value=option,
+                value=i,
                 font=("Helvetica", 10),
-                bg=self.root.cget("bg")
+                bg=PAGE_BG
             )
             rb.grid(row=0, column=i, padx=20, pady=5, sticky="w")
     
@@ -182,7 +188,7 @@ Información:
             self.main_frame,
             text=info_text,
             font=("Helvetica", 10),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#666666",
             justify=tk.LEFT
         )
@@ -191,6 +197,7 @@ Información:
     def _browse_input_file(self):
         """Abre diálogo para seleccionar archivo Excel."""
         file_path = filedialog.askopenfilename(
+            parent=self.root,
             title="Seleccionar archivo Excel",
             filetypes=[
                 ("Archivos Excel", "*.xlsx *.xls"),
@@ -204,6 +211,7 @@ Información:
     def _browse_output_file(self):
         """Abre diálogo para seleccionar ubicación de archivo KMZ."""
         file_path = filedialog.asksaveasfilename(
+            parent=self.root,
             title="Guardar archivo KMZ como",
             defaultextension=".kmz",
             filetypes=[("Archivos KMZ", "*.kmz"), ("Todos los archivos", "*.*")]
@@ -213,67 +221,23 @@ Información:
     
     def _get_source_crs(self):
         """Obtiene el CRS de origen basado en la selección."""
-        crs_selection = self.source_crs.get()
-        
-        if crs_selection == "UTM 19S (Chile)":
-            return DEFAULT_CRS["utm_chile"]
-        elif crs_selection == "WGS84 (Geográficas)":
-            return DEFAULT_CRS["geographic"]
-        else:  # Auto-detectar
-            return "auto"
+        return SOURCE_CRS_OPTIONS[self.source_crs.get()][1]
     
     def _preview_data(self):
         """Muestra vista previa de los datos del Excel."""
+        if self.is_processing:
+            return
+        
         try:
-            InputValidator.validate_file_path_input(self.input_file.get(), "excel")
-            
-            import pandas as pd
-            df = pd.read_excel(self.input_file.get())
-            
-            # Crear ventana de vista previa
-            preview_window = tk.Toplevel(self.root)
-            preview_window.title("Vista Previa de Datos")
-            preview_window.geometry("800x400")
-            preview_window.configure(bg="white")
-            
-            # Frame para la tabla
-            table_frame = tk.Frame(preview_window)
-            table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            # Crear Treeview para mostrar datos
-            columns = list(df.columns)
-            tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
-            
-            # Configurar columnas
-            for col in columns:
-                tree.heading(col, text=col)
-                tree.column(col, width=100)
+            self.validate_input_file(self.input_file.get(), "excel")
             
-            # Agregar datos (primeras 50 filas)
-            for index, row in df.head(50).iterrows():
-                tree.insert("", "end", values=list(row))
-            
-            # Scrollbars
-            v_scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
-            h_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xview)
-            tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-            
-            # Posicionar widgets
-            tree.grid(row=0, column=0, sticky="nsew")
-            v_scrollbar.grid(row=0, column=1, sticky="ns")
-            h_scrollbar.grid(row=1, column=0, sticky="ew")
-            
-            table_frame.grid_rowconfigure(0, weight=1)
-            table_frame.grid_columnconfigure(0, weight=1)
-            
-            # Información
-            info_label = tk.Label(
-                preview_window,
-                text=f"Mostrando primeras 50 filas de {len(df)} total. Columnas disponibles: {', '.join(columns)}",
-                bg="white",
-                fg="#666666"
+            # Leer el Excel en segundo plano para no congelar la ventana
+            self.set_processing(True, "Leyendo datos...")
+            self.run_background_task(
+                self._load_preview,
+                self._on_preview_done,
+                self.input_file.get()
             )
-            info_label.pack(pady=5)
             
         except ValidationError as e:
             self.show_error(str(e))
@@ -281,6 +245,71 @@ Información:
             logger.error(f"Error en vista previa: {e}")
             self.show_error(f"Error mostrando vista previa: {e}")
     
+    def _load_preview(self, input_path: str) -> tuple:
+        """Lee el Excel y prepara las filas de la vista previa (se ejecuta en segundo plano)."""
+        df = read_excel(input_path)
+        
+        rows = list(df.head(PREVIEW_ROWS).itertuples(index=False, name=None))
+        return list(df.columns), rows, len(df)
+    
+    def _on_preview_done(self, future):
+        """Muestra la vista previa de datos (en el hilo de Tk)."""
+        self.set_processing(False)
+        
+        try:
+            columns, rows, total = future.result()
+        except Exception as e:
+            logger.error(f"Error en vista previa: {e}")
+            self.show_error(f"Error mostrando vista previa: {e}")
+            return
+        
+        self._show_preview_window(columns, rows, total)
+    
+    def _show_preview_window(self, columns: list, rows: list, total: int):
+        """Muestra ventana con las primeras filas del Excel."""
+        # Crear ventana de vista previa
+        preview_window = tk.Toplevel(self.root)
+        preview_window.title("Vista Previa de Datos")
+        preview_window.geometry("800x400")
+        preview_window.configure(bg="white")
+        
+        # Frame para la tabla
+        table_frame = tk.Frame(preview_window)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Crear Treeview para mostrar datos
+        tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
+        
+        # Configurar columnas
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=100)
+        
+        # Agregar datos: todas las filas en una sola llamada a Tcl
+        tree.tk.call("apply", _TREE_INSERT_ROWS, str(tree), tuple(rows))
+        
+        # Scrollbars
+        v_scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
+        h_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal", command=tree.xview)
+        tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        
+        # Posicionar widgets
+        tree.grid(row=0, column=0, sticky="nsew")
+        v_scrollbar.grid(row=0, column=1, sticky="ns")
+        h_scrollbar.grid(row=1, column=0, sticky="ew")
+        
+        table_frame.grid_rowconfigure(0, weight=1)
+        table_frame.grid_columnconfigure(0, weight=1)
+        
+        # Información
+        info_label = tk.Label(
+            preview_window,
+            text=f"Mostrando primeras {len(rows)} filas de {total} total. Columnas disponibles: {', '.join(map(str, columns))}",
+            bg="white",
+            fg="#666666"
+        )
+        info_label.pack(pady=5)
+    
     def _create_kmz(self):
         """Crea el archivo KMZ desde Excel."""
         if self.is_processing:
@@ -288,7 +317,7 @@ Información:
         
         try:
             # Validar entradas
-            InputValidator.validate_file_path_input(self.input_file.get(), "excel")
+            self.validate_input_file(self.input_file.get(), "excel")
             output_path = InputValidator.validate_output_path(self.output_file.get(), ".kmz")
             
             # Validar configuración de columnas
@@ -296,13 +325,19 @@ Información:
             if not all(col.strip() for col in required_cols):
                 raise ValidationError("Debe especificar nombres para las columnas requeridas")
             
-            # Ejecutar en hilo separado
-            thread = threading.Thread(
-                target=self._create_kmz_thread,
-                args=(self.input_file.get(), output_path)
+            # Ejecutar en segundo plano
+            self.set_processing(True, "Creando archivo KMZ...")
+            self.run_process_task(
+                self.processor.create_kmz_from_excel,
+                partial(self._on_create_kmz_done, output_path=output_path),
+                self.input_file.get(),
+                output_path,
+                name_col=self.name_col.get(),
+                x_col=self.x_col.get(),
+                y_col=self.y_col.get(),
+                desc_col=self.desc_col.get(),
+                source_crs=self._get_source_crs()
             )
-            thread.daemon = True
-            thread.start()
             
         except ValidationError as e:
             self.show_error(str(e))
@@ -310,36 +345,21 @@ Información:
             logger.error(f"Error iniciando creación de KMZ: {e}")
             self.show_error(f"Error inesperado: {e}")
     
-    def _create_kmz_thread(self, input_path: str, output_path: str):
-        """Ejecuta la creación de KMZ en un hilo separado."""
+    def _on_create_kmz_done(self, future, output_path: str):
+        """Muestra el resultado de la creación de KMZ (en el hilo de Tk)."""
+        self.set_processing(False)
+        
         try:
-            self.root.after(0, lambda: self.set_processing(True, "Creando archivo KMZ..."))
-            
-            # Obtener configuración
-            source_crs = self._get_source_crs()
-            
-            # Procesar archivo
-            success = self.processor.create_kmz_from_excel(
-                input_path,
-                output_path,
-                name_col=self.name_col.get(),
-                x_col=self.x_col.get(),
-                y_col=self.y_col.get(),
-                desc_col=self.desc_col.get(),
-                source_crs=source_crs
-            )
-            
-            if success:
-                message = f"Archivo KMZ creado exitosamente:\n{output_path}"
-                self.root.after(0, lambda: self.show_success(message))
-            else:
-                self.root.after(0, lambda: self.show_error("Error durante la creación del KMZ"))
-                
+            success = future.result()
         except Exception as e:
             logger.error(f"Error en creación de KMZ: {e}")
-            self.root.after(0, lambda: self.show_error(f"Error durante la creación: {e}"))
-        finally:
-            self.root.after(0, lambda: self.set_processing(False))
+            self.show_error(f"Error durante la creación: {e}")
+            return
+        
+        if success:
+            self.show_success(f"Archivo KMZ creado exitosamente:\n{output_path}")
+        else:
+            self.show_error("Error durante la creación del KMZ")
     
     def _return_to_menu(self):
         """Regresa al menú principal."""
@@ -4,8 +4,7 @@ Página para convertir archivos GPX a KMZ.
 """
 
 import tkinter as tk
-from tkinter import filedialog, ttk
-import threading
+from tkinter import filedialog
 import sys
 import os
 
@@ -15,7 +14,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.ui.base_window import BaseWindow
 from src.core.gpx_processor import GPXProcessor
 from src.core.validators import InputValidator, ValidationError
-from src.core.config import logger
+from src.core.config import logger, UI_COLORS
+
+# Fondo de la página, resuelto una vez para todos los widgets
+PAGE_BG = UI_COLORS["bg_primary"]
 
 class GPXConverterPage(BaseWindow):
     """Página para convertir GPX a KMZ."""
@@ -59,7 +61,7 @@ class GPXConverterPage(BaseWindow):
         self._create_info_frame()
         
         # Botones de acción
-        button_frame = tk.Frame(self.main_frame, bg=self.root.cget("bg"))
+        button_frame = tk.Frame(self.main_frame, bg=PAGE_BG)
         button_frame.grid(row=4, column=0, columnspan=3, pady=20)
         
         self.create_action_button(
@@ -92,7 +94,7 @@ class GPXConverterPage(BaseWindow):
             self.main_frame,
             text="Información del archivo GPX",
             font=("Helvetica", 12, "bold"),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#E4610F",
             padx=15,
             pady=10
@@ -118,14 +120,14 @@ class GPXConverterPage(BaseWindow):
                 self.info_frame,
                 text=label_text,
                 font=("Helvetica", 10, "bold"),
-                bg=self.root.cget("bg")
+                bg=PAGE_BG
             ).grid(row=row, column=col, sticky="w", padx=5, pady=2)
             
             info_label = tk.Label(
                 self.info_frame,
                 text="No disponible",
                 font=("Helvetica", 10),
-                bg=self.root.cget("bg"),
+                bg=PAGE_BG,
                 fg="#666666"
             )
             info_label.grid(row=row, column=col+1, sticky="w", padx=5, pady=2)
@@ -150,7 +152,7 @@ Información sobre conversión GPX:
             self.main_frame,
             text=help_text,
             font=("Helvetica", 10),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#666666",
             justify=tk.LEFT
         )
@@ -159,6 +161,7 @@ Información sobre conversión GPX:
     def _browse_input_file(self):
         """Abre diálogo para seleccionar archivo GPX."""
         file_path = filedialog.askopenfilename(
+            parent=self.root,
             title="Seleccionar archivo GPX",
             filetypes=[("Archivos GPX", "*.gpx"), ("Todos los archivos", "*.*")]
         )
@@ -177,6 +180,7 @@ Información sobre conversión GPX:
     def _browse_output_file(self):
         """Abre diálogo para seleccionar ubicación de archivo KMZ."""
         file_path = filedialog.asksaveasfilename(
+            parent=self.root,
             title="Guardar archivo KMZ como",
             defaultextension=".kmz",
             filetypes=[("Archivos KMZ", "*.kmz"), ("Todos los archivos", "*.*")]
@@ -193,12 +197,16 @@ Información sobre conversión GPX:
     def _analyze_gpx(self):
         """Analiza el archivo GPX y muestra información."""
         try:
-            InputValidator.validate_file_path_input(self.input_file.get(), "gpx")
+            self.validate_input_file(self.input_file.get(), "gpx")
             
-            # Ejecutar análisis en hilo separado
-            thread = threading.Thread(target=self._analyze_gpx_thread)
-            thread.daemon = True
-            thread.start()
+            # Ejecutar análisis en el proceso trabajador, donde queda en caché
+            # el GPX parseado que luego reutiliza la conversión
+            self.set_processing(True, "Analizando archivo GPX...")
+            self.run_process_task(
+                self.processor.get_gpx_info,
+                self._on_analyze_done,
+                self.input_file.get()
+            )
             
         except ValidationError as e:
             self.show_error(str(e))
@@ -206,22 +214,19 @@ Información sobre conversión GPX:
             logger.error(f"Error iniciando análisis: {e}")
             self.show_error(f"Error inesperado: {e}")
     
-    def _analyze_gpx_thread(self):
-        """Ejecuta el análisis del GPX en un hilo separado."""
+    def _on_analyze_done(self, future):
+        """Muestra el resultado del análisis del GPX (en el hilo de Tk)."""
+        self.set_processing(False)
+        
         try:
-            self.root.after(0, lambda: self.set_processing(True, "Analizando archivo GPX..."))
-            
-            # Obtener información del GPX
-            self.gpx_info = self.processor.get_gpx_info(self.input_file.get())
-            
-            # Actualizar interfaz
-            self.root.after(0, self._update_gpx_info_display)
-            
+            self.gpx_info = future.result()
         except Exception as e:
             logger.error(f"Error analizando GPX: {e}")
-            self.root.after(0, lambda: self.show_error(f"Error analizando GPX: {e}"))
-        finally:
-            self.root.after(0, lambda: self.set_processing(False))
+            self.show_error(f"Error analizando GPX: {e}")
+            return
+        
+        # Actualizar interfaz
+        self._update_gpx_info_display()
     
     def _update_gpx_info_display(self):
         """Actualiza la visualización de información del GPX."""
@@ -268,16 +273,17 @@ Información sobre conversión GPX:
         
         try:
             # Validar entradas
-            InputValidator.validate_file_path_input(self.input_file.get(), "gpx")
+            self.validate_input_file(self.input_file.get(), "gpx")
             output_path = InputValidator.validate_output_path(self.output_file.get(), ".kmz")
             
-            # Ejecutar en hilo separado
-            thread = threading.Thread(
-                target=self._convert_gpx_thread,
-                args=(self.input_file.get(), output_path)
+            # Ejecutar en segundo plano
+            self.set_processing(True, "Convirtiendo GPX a KMZ...")
+            self.run_process_task(
+                self.processor.convert_gpx_to_kmz,
+                self._on_convert_done,
+                self.input_file.get(),
+                output_path
             )
-            thread.daemon = True
-            thread.start()
             
         except ValidationError as e:
             self.show_error(str(e))
@@ -285,25 +291,21 @@ Información sobre conversión GPX:
             logger.error(f"Error iniciando conversión: {e}")
             self.show_error(f"Error inesperado: {e}")
     
-    def _convert_gpx_thread(self, input_path: str, output_path: str):
-        """Ejecuta la conversión en un hilo separado."""
+    def _on_convert_done(self, future):
+        """Muestra el resultado de la conversión (en el hilo de Tk)."""
+        self.set_processing(False)
+        
         try:
-            self.root.after(0, lambda: self.set_processing(True, "Convirtiendo GPX a KMZ..."))
-            
-            # Convertir archivo
-            result_path = self.processor.convert_gpx_to_kmz(input_path, output_path)
-            
-            if result_path:
-                message = f"Archivo convertido exitosamente:\n{result_path}"
-                self.root.after(0, lambda: self.show_success(message))
-            else:
-                self.root.after(0, lambda: self.show_error("Error durante la conversión"))
-                
+            result_path = future.result()
         except Exception as e:
             logger.error(f"Error en conversión: {e}")
-            self.root.after(0, lambda: self.show_error(f"Error durante la conversión: {e}"))
-        finally:
-            self.root.after(0, lambda: self.set_processing(False))
+            self.show_error(f"Error durante la conversión: {e}")
+            return
+        
+        if result_path:
+            self.show_success(f"Archivo convertido exitosamente:\n{result_path}")
+        else:
+            self.show_error("Error durante la conversión")
     
     def _return_to_menu(self):
         """Regresa al menú principal."""
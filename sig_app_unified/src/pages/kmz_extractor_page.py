@@ -5,9 +5,9 @@ Página para extraer coordenadas de archivos KMZ a Excel.
 
 import tkinter as tk
 from tkinter import filedialog
-import threading
 import sys
 import os
+from functools import partial
 
 # Agregar el directorio src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -15,7 +15,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.ui.base_window import BaseWindow
 from src.core.kmz_processor import KMZProcessor
 from src.core.validators import InputValidator, ValidationError
-from src.core.config import logger, SUPPORTED_FORMATS
+from src.core.config import logger, UI_COLORS, SUPPORTED_FORMATS, CRS_CHOICES
+
+# Fondo de la página, resuelto una vez para todos los widgets
+PAGE_BG = UI_COLORS["bg_primary"]
 
 class KMZExtractorPage(BaseWindow):
     """Página para extraer coordenadas de KMZ a Excel."""
@@ -55,7 +58,7 @@ class KMZExtractorPage(BaseWindow):
         )
         
         # Frame para opciones adicionales
-        options_frame = tk.Frame(self.main_frame, bg=self.root.cget("bg"))
+        options_frame = tk.Frame(self.main_frame, bg=PAGE_BG)
         options_frame.grid(row=3, column=0, columnspan=3, pady=15, sticky="ew")
         
         # Opción de sistema de coordenadas
@@ -63,21 +66,19 @@ class KMZExtractorPage(BaseWindow):
             options_frame,
             text="Sistema de coordenadas de salida:",
             font=("Helvetica", 12),
-            bg=self.root.cget("bg")
+            bg=PAGE_BG
         ).pack(side=tk.LEFT)
         
         self.crs_var = tk.StringVar(value="UTM 19S (Chile)")
         crs_combo = tk.OptionMenu(
             options_frame,
             self.crs_var,
-            "UTM 19S (Chile)",
-            "WGS84 (Geográficas)",
-            "Auto-detectar"
+            *CRS_CHOICES
         )
         crs_combo.pack(side=tk.LEFT, padx=(10, 0))
         
         # Botones de acción
-        button_frame = tk.Frame(self.main_frame, bg=self.root.cget("bg"))
+        button_frame = tk.Frame(self.main_frame, bg=PAGE_BG)
         button_frame.grid(row=4, column=0, columnspan=3, pady=20)
         
         self.create_action_button(
@@ -107,7 +108,7 @@ Información:
             self.main_frame,
             text=info_text,
             font=("Helvetica", 10),
-            bg=self.root.cget("bg"),
+            bg=PAGE_BG,
             fg="#666666",
             justify=tk.LEFT
         )
@@ -116,6 +117,7 @@ Información:
     def _browse_input_file(self):
         """Abre diálogo para seleccionar archivo KMZ de entrada."""
         file_path = filedialog.askopenfilename(
+            parent=self.root,
             title="Seleccionar archivo KMZ",
             filetypes=[("Archivos KMZ", "*.kmz"), ("Todos los archivos", "*.*")]
         )
@@ -126,6 +128,7 @@ Información:
     def _browse_output_file(self):
         """Abre diálogo para seleccionar ubicación de archivo Excel."""
         file_path = filedialog.asksaveasfilename(
+            parent=self.root,
             title="Guardar archivo Excel como",
             defaultextension=".xlsx",
             filetypes=[("Archivos Excel", "*.xlsx"), ("Todos los archivos", "*.*")]
@@ -135,14 +138,7 @@ Información:
     
     def _get_target_crs(self):
         """Obtiene el CRS de destino basado en la selección."""
-        crs_selection = self.crs_var.get()
-        
-        if crs_selection == "UTM 19S (Chile)":
-            return "EPSG:32719"
-        elif crs_selection == "WGS84 (Geográficas)":
-            return "EPSG:4326"
-        else:  # Auto-detectar
-            return "auto"
+        return CRS_CHOICES[self.crs_var.get()]
     
     def _extract_coordinates(self):
         """Extrae coordenadas del KMZ a Excel."""
@@ -151,16 +147,18 @@ Información:
         
         try:
             # Validar entradas
-            InputValidator.validate_file_path_input(self.input_file.get(), "kmz")
+            self.validate_input_file(self.input_file.get(), "kmz")
             output_path = InputValidator.validate_output_path(self.output_file.get(), ".xlsx")
             
-            # Ejecutar en hilo separado
-            thread = threading.Thread(
-                target=self._extract_coordinates_thread,
-                args=(self.input_file.get(), output_path)
+            # Ejecutar en segundo plano
+            self.set_processing(True, "Extrayendo coordenadas...")
+            self.run_process_task(
+                self.processor.extract_coordinates_to_excel,
+                partial(self._on_extraction_done, output_path=output_path),
+                self.input_file.get(),
+                output_path,
+                self._get_target_crs()
             )
-            thread.daemon = True
-            thread.start()
             
         except ValidationError as e:
             self.show_error(str(e))
@@ -168,32 +166,21 @@ Información:
             logger.error(f"Error iniciando extracción: {e}")
             self.show_error(f"Error inesperado: {e}")
     
-    def _extract_coordinates_thread(self, input_path: str, output_path: str):
-        """Ejecuta la extracción en un hilo separado."""
+    def _on_extraction_done(self, future, output_path: str):
+        """Muestra el resultado de la extracción (en el hilo de Tk)."""
+        self.set_processing(False)
+        
         try:
-            self.root.after(0, lambda: self.set_processing(True, "Extrayendo coordenadas..."))
-            
-            # Obtener CRS de destino
-            target_crs = self._get_target_crs()
-            
-            # Procesar archivo
-            success = self.processor.extract_coordinates_to_excel(
-                input_path, 
-                output_path, 
-                target_crs
-            )
-            
-            if success:
-                message = f"Coordenadas extraídas exitosamente a:\n{output_path}"
-                self.root.after(0, lambda: self.show_success(message))
-            else:
-                self.root.after(0, lambda: self.show_error("Error durante la extracción"))
-                
+            success = future.result()
         except Exception as e:
             logger.error(f"Error en extracción: {e}")
-            self.root.after(0, lambda: self.show_error(f"Error durante la extracción: {e}"))
-        finally:
-            self.root.after(0, lambda: self.set_processing(False))
+            self.show_error(f"Error durante la extracción: {e}")
+            return
+        
+        if success:
+            self.show_success(f"Coordenadas extraídas exitosamente a:\n{output_path}")
+        else:
+            self.show_error("Error durante la extracción")
     
     def _return_to_menu(self):
         """Regresa al menú principal."""
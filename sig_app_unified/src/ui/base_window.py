@@ -4,14 +4,159 @@ Ventana base para todas las interfaces de la aplicación SIG.
 Proporciona funcionalidad común y estilo consistente.
 """
 
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox
-from typing import Optional, Callable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Callable
 from src.core.config import UI_COLORS, UI_FONTS, logger
 
+if TYPE_CHECKING:
+    from tkinter import ttk
+
+# Ejecutor compartido para las tareas livianas fuera del hilo de Tk (vistas previas).
+# pyproj, zipfile y GEOS liberan el GIL, por lo que los hilos son suficientes.
+# Se crea con la primera tarea: utils carga NumPy, que el menú no necesita
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Obtiene el ejecutor compartido, creándolo la primera vez."""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        from src.core.utils import available_cpus
+        _EXECUTOR = ThreadPoolExecutor(max_workers=max(2, available_cpus() // 2),
+                                       thread_name_prefix="sig-worker")
+    return _EXECUTOR
+
+# Proceso trabajador para el procesamiento que es Python puro (lectura del
+# KML, armado del Excel y del KML), que en un hilo competiría por el GIL con
+# la interfaz. Se usa "spawn": hacer fork de un proceso con Tk e hilos no es
+# seguro. Se crea con la primera tarea para no pagar su arranque en el menú
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+
+# Procesadores creados dentro del proceso trabajador, uno por clase, para
+# conservar sus cachés entre tareas
+_WORKER_PROCESSORS = {}
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Obtiene el proceso trabajador compartido, creándolo la primera vez."""
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        import multiprocessing
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=1,
+                                            mp_context=multiprocessing.get_context("spawn"))
+    return _PROCESS_POOL
+
+def _run_processor_method(processor_class: type, method_name: str, *args, **kwargs):
+    """
+    Ejecuta un método de procesador dentro del proceso trabajador.
+    
+    Las excepciones vuelven a la interfaz serializadas con pickle, y algunas
+    no lo admiten (p. ej. XMLSyntaxError de lxml); salvo ValidationError se
+    reemplazan por un RuntimeError con el tipo y el mensaje originales.
+    """
+    from src.core.validators import ValidationError
+    
+    processor = _WORKER_PROCESSORS.get(processor_class)
+    if processor is None:
+        processor = _WORKER_PROCESSORS[processor_class] = processor_class()
+    try:
+        return getattr(processor, method_name)(*args, **kwargs)
+    except ValidationError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def shutdown_process_pool():
+    """
+    Detiene el proceso trabajador al salir de la aplicación.
+    
+    Sin esto, al terminar el intérprete se espera a que acabe la conversión
+    en curso; aquí se cancelan las tareas pendientes y se termina el proceso.
+    """
+    global _PROCESS_POOL
+    pool, _PROCESS_POOL = _PROCESS_POOL, None
+    if pool is None:
+        return
+    
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+# Intervalo de sondeo (ms) de tareas en segundo plano
+_POLL_INTERVAL_MS = 50
+
+# Tiempo (ms) que permanece visible un aviso antes de ocultarse solo
+_TOAST_DURATION_MS = 2000
+
+# Bindtag compartido por los widgets con efecto hover: los manejadores se
+# registran una vez por intérprete de Tk en lugar de dos closures por botón
+HOVER_BINDTAG = "FastSigHover"
+
+# Tamaño de pantalla consultado una sola vez para centrar todas las ventanas
+_SCREEN_SIZE = None
+
+def get_screen_size(root: tk.Misc) -> tuple:
+    """
+    Obtiene (ancho, alto) de la pantalla, consultando a Tk solo la primera vez.
+    
+    Args:
+        root: Cualquier widget de la aplicación
+        
+    Returns:
+        Tupla (ancho, alto) en píxeles
+    """
+    global _SCREEN_SIZE
+    if _SCREEN_SIZE is None:
+        _SCREEN_SIZE = (root.winfo_screenwidth(), root.winfo_screenheight())
+    return _SCREEN_SIZE
+
+def _hover_enter(event):
+    """Aplica el estilo hover del grupo del widget."""
+    for widget, enter_options, _ in getattr(event.widget, "_hover_styles", ()):
+        widget.configure(**enter_options)
+
+def _hover_leave(event):
+    """Restaura el estilo normal del grupo del widget."""
+    for widget, _, leave_options in getattr(event.widget, "_hover_styles", ()):
+        widget.configure(**leave_options)
+
+def register_hover_bindings(root: tk.Misc) -> None:
+    """Registra los manejadores de hover si el intérprete aún no los tiene."""
+    if not root.bind_class(HOVER_BINDTAG):
+        root.bind_class(HOVER_BINDTAG, "<Enter>", _hover_enter)
+        root.bind_class(HOVER_BINDTAG, "<Leave>", _hover_leave)
+
+def add_hover_effect(styles: list) -> None:
+    """
+    Activa el efecto hover en un grupo de widgets.
+    
+    Al entrar o salir de cualquier widget del grupo se aplican las opciones
+    de todos, sin registrar callbacks por widget.
+    
+    Args:
+        styles: Lista de tuplas (widget, opciones_hover, opciones_normales)
+    """
+    for widget, _, _ in styles:
+        widget._hover_styles = styles
+        widget.bindtags((HOVER_BINDTAG,) + widget.bindtags())
+
 class BaseWindow:
     """Clase base para todas las ventanas de la aplicación."""
     
+    # Atributos comunes en slots; las páginas declaran los suyos libremente
+    # (sin __slots__ propios conservan su __dict__)
+    __slots__ = (
+        "parent", "root", "is_processing", "status_var", "status_label",
+        "_pending_status_color", "_status_after_id", "style", "main_frame",
+        "_toast", "_toast_after", "on_close_callback", "reusable", "_validated_input"
+    )
+    
+    # Intérprete de Tk cuyos estilos ttk ya se configuraron (son globales
+    # al intérprete, así que basta con hacerlo en la primera ventana)
+    _styled_interp = None
+    
     def __init__(self, title: str, width: int = 800, height: int = 600, 
                  resizable: bool = True, parent: Optional[tk.Tk] = None):
         """
@@ -30,12 +175,13 @@ class BaseWindow:
         self.root.configure(bg=UI_COLORS["bg_primary"])
         self.root.resizable(resizable, resizable)
         
-        # Configurar tamaño y posición
-        self._center_window(width, height)
-        
         # Variables de estado
         self.is_processing = False
         self.status_var = tk.StringVar()
+        self.status_label: Optional["ttk.Label"] = None
+        self._pending_status_color: Optional[str] = None
+        self._status_after_id: Optional[str] = None
+        self._validated_input: Optional[tuple] = None
         
         # Configurar estilo
         self._setup_styles()
@@ -44,14 +190,26 @@ class BaseWindow:
         self.main_frame = tk.Frame(self.root, bg=UI_COLORS["bg_primary"])
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
+        # Configurar tamaño y posición. La geometría se fija antes de que Tk
+        # mapee la ventana (lo hace al quedar ocioso), por lo que el primer
+        # layout ya usa el tamaño final y no hace falta update_idletasks()
+        self._center_window(width, height)
+        
+        # Aviso no modal reutilizable (reemplaza a los messagebox de estado)
+        self._toast = tk.Label(self.root, font=UI_FONTS["body"], fg="white",
+                               padx=15, pady=8, wraplength=500)
+        self._toast_after: Optional[str] = None
+        
         # Callback para cerrar ventana
         self.on_close_callback: Optional[Callable] = None
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        # Si es reutilizable, cerrar solo oculta la ventana para volver a mostrarla
+        self.reusable = False
     
     def _center_window(self, width: int, height: int):
         """Centra la ventana en la pantalla."""
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
+        screen_width, screen_height = get_screen_size(self.root)
         
         x = (screen_width - width) // 2
         y = (screen_height - height) // 2
@@ -60,7 +218,13 @@ class BaseWindow:
     
     def _setup_styles(self):
         """Configura estilos personalizados."""
-        self.style = ttk.Style()
+        from tkinter import ttk
+        
+        self.style = ttk.Style(self.root)
+        if BaseWindow._styled_interp is self.root.tk:
+            return
+        
+        register_hover_bindings(self.root)
         
         # Configurar tema
         self.style.theme_use('clam')
@@ -88,8 +252,21 @@ class BaseWindow:
             font=UI_FONTS["body"],
             padding=(10, 6)
         )
+        
+        # Estilos de etiquetas: colores y fuentes se fijan una vez aquí en lugar
+        # de pasarse a cada widget (Title. y Status. heredan de FastSig.TLabel)
+        self.style.configure(
+            "FastSig.TLabel",
+            background=UI_COLORS["bg_primary"],
+            foreground=UI_COLORS["text_primary"],
+            font=UI_FONTS["body"]
+        )
+        self.style.configure("Title.FastSig.TLabel", font=UI_FONTS["title"])
+        self.style.configure("Status.FastSig.TLabel", foreground=UI_COLORS["text_secondary"])
+        
+        BaseWindow._styled_interp = self.root.tk
     
-    def create_title(self, text: str, row: int = 0) -> tk.Label:
+    def create_title(self, text: str, row: int = 0) -> "ttk.Label":
         """
         Crea un título principal.
         
@@ -100,13 +277,9 @@ class BaseWindow:
         Returns:
             Widget Label creado
         """
-        title_label = tk.Label(
-            self.main_frame,
-            text=text,
-            font=UI_FONTS["title"],
-            bg=UI_COLORS["bg_primary"],
-            fg=UI_COLORS["text_primary"]
-        )
+        from tkinter import ttk
+        
+        title_label = ttk.Label(self.main_frame, text=text, style="Title.FastSig.TLabel")
         title_label.grid(row=row, column=0, columnspan=3, pady=(0, 20), sticky="ew")
         return title_label
     
@@ -126,14 +299,10 @@ class BaseWindow:
         Returns:
             Tupla (label, entry, button)
         """
+        from tkinter import ttk
+        
         # Etiqueta
-        label = tk.Label(
-            self.main_frame,
-            text=label_text,
-            font=UI_FONTS["body"],
-            bg=UI_COLORS["bg_primary"],
-            fg=UI_COLORS["text_primary"]
-        )
+        label = ttk.Label(self.main_frame, text=label_text, style="FastSig.TLabel")
         label.grid(row=row, column=0, sticky="w", pady=5)
         
         # Campo de entrada
@@ -161,12 +330,15 @@ class BaseWindow:
             bd=0,
             padx=15,
             pady=8,
-            cursor="hand2"
+            cursor="hand2",
+            activebackground=UI_COLORS["accent_hover"],
+            activeforeground="white"
         )
         button.grid(row=row, column=2, padx=5, pady=5)
         
         # Efectos hover
-        self._add_hover_effects(button)
+        add_hover_effect([(button, {"background": UI_COLORS["accent_hover"]},
+                           {"background": UI_COLORS["accent_primary"]})])
         
         return label, entry, button
     
@@ -206,16 +378,18 @@ class BaseWindow:
             bd=0,
             padx=20,
             pady=10,
-            cursor="hand2"
+            cursor="hand2",
+            activebackground=hover_color,
+            activeforeground="white"
         )
         button.grid(row=row, column=column, pady=15, padx=5)
         
         # Efectos hover
-        self._add_hover_effects(button, hover_color)
+        add_hover_effect([(button, {"background": hover_color}, {"background": bg_color})])
         
         return button
     
-    def create_status_label(self, row: int) -> tk.Label:
+    def create_status_label(self, row: int) -> "ttk.Label":
         """
         Crea una etiqueta de estado.
         
@@ -225,50 +399,66 @@ class BaseWindow:
         Returns:
             Widget Label creado
         """
-        status_label = tk.Label(
+        from tkinter import ttk
+        
+        status_label = ttk.Label(
             self.main_frame,
             textvariable=self.status_var,
-            font=UI_FONTS["body"],
-            bg=UI_COLORS["bg_primary"],
-            fg=UI_COLORS["text_secondary"],
+            style="Status.FastSig.TLabel",
             wraplength=600
         )
         status_label.grid(row=row, column=0, columnspan=3, pady=10)
+        self.status_label = status_label
         return status_label
     
-    def _add_hover_effects(self, button: tk.Button, hover_color: str = None):
-        """Agrega efectos hover a un botón."""
-        if hover_color is None:
-            hover_color = UI_COLORS["accent_hover"]
-        
-        original_color = button.cget("background")
-        
-        def on_enter(e):
-            button.configure(background=hover_color)
-        
-        def on_leave(e):
-            button.configure(background=original_color)
-        
-        button.bind("<Enter>", on_enter)
-        button.bind("<Leave>", on_leave)
-    
     def show_success(self, message: str):
         """Muestra mensaje de éxito."""
         self.status_var.set(message)
-        self.root.after(100, lambda: self._update_status_color(UI_COLORS["success"]))
-        messagebox.showinfo("Éxito", message)
+        self._update_status_color(UI_COLORS["success"])
+        self._show_toast(message, UI_COLORS["success"])
     
     def show_error(self, message: str):
         """Muestra mensaje de error."""
         self.status_var.set(f"Error: {message}")
-        self.root.after(100, lambda: self._update_status_color(UI_COLORS["error"]))
-        messagebox.showerror("Error", message)
+        self._update_status_color(UI_COLORS["error"])
+        self._show_toast(message, UI_COLORS["error"])
     
     def show_warning(self, message: str):
         """Muestra mensaje de advertencia."""
         self.status_var.set(f"Advertencia: {message}")
-        self.root.after(100, lambda: self._update_status_color(UI_COLORS["warning"]))
-        messagebox.showwarning("Advertencia", message)
+        self._update_status_color(UI_COLORS["warning"])
+        self._show_toast(message, UI_COLORS["warning"], fg=UI_COLORS["text_primary"])
+    
+    def _show_toast(self, message: str, bg: str, fg: str = "white"):
+        """
+        Muestra un aviso sobre la ventana que se oculta solo.
+        
+        A diferencia de messagebox, no abre un bucle de eventos modal: la
+        ventana sigue respondiendo y el mensaje queda en la etiqueta de estado.
+        
+        Args:
+            message: Texto del aviso
+            bg: Color de fondo
+            fg: Color del texto
+        """
+        try:
+            self._toast.configure(text=message, bg=bg, fg=fg)
+            self._toast.place(relx=0.5, rely=0.05, anchor="n")
+            self._toast.lift()
+            if self._toast_after is not None:
+                self.root.after_cancel(self._toast_after)
+            self._toast_after = self.root.after(_TOAST_DURATION_MS, self._hide_toast)
+        except tk.TclError:
+            # La ventana ya fue destruida
+            pass
+    
+    def _hide_toast(self):
+        """Oculta el aviso."""
+        self._toast_after = None
+        try:
+            self._toast.place_forget()
+        except tk.TclError:
+            pass
     
     def set_processing(self, is_processing: bool, message: str = ""):
         """
@@ -290,11 +480,111 @@ class BaseWindow:
                 self.status_var.set("")
     
     def _update_status_color(self, color: str):
-        """Actualiza el color de la etiqueta de estado."""
-        for widget in self.main_frame.winfo_children():
-            if isinstance(widget, tk.Label) and widget.cget("textvariable") == str(self.status_var):
-                widget.configure(fg=color)
-                break
+        """
+        Actualiza el color de la etiqueta de estado.
+        
+        El cambio se aplica cuando Tk queda ocioso: varios mensajes seguidos
+        (por ejemplo, durante un lote) se agrupan en un único configure.
+        """
+        self._pending_status_color = color
+        if self._status_after_id is None:
+            try:
+                self._status_after_id = self.root.after_idle(self._flush_status_color)
+            except tk.TclError:
+                pass
+    
+    def _flush_status_color(self):
+        """Aplica el último color de estado pendiente."""
+        self._status_after_id = None
+        if self.status_label is None or self._pending_status_color is None:
+            return
+        try:
+            self.status_label.configure(foreground=self._pending_status_color)
+        except tk.TclError:
+            # La etiqueta ya fue destruida junto con la ventana
+            pass
+    
+    def validate_input_file(self, path: str, file_type: str) -> None:
+        """
+        Valida el archivo de entrada, recordando la última validación exitosa.
+        
+        Validar un KMZ o Excel abre el archivo; si la ruta, su fecha de
+        modificación y su tamaño no cambiaron desde la última validación
+        (p. ej. vista previa y luego procesar) basta con un stat.
+        
+        Args:
+            path: Ruta ingresada por usuario
+            file_type: Tipo de archivo esperado
+            
+        Raises:
+            ValidationError: Si la entrada no es válida
+        """
+        from src.core.validators import InputValidator
+        
+        try:
+            stat = os.stat(path.strip())
+            key = (path, file_type, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+        
+        if key is None or key != self._validated_input:
+            InputValidator.validate_file_path_input(path, file_type)
+            self._validated_input = key
+    
+    def run_background_task(self, task: Callable, on_done: Callable[[Future], None],
+                            *args, **kwargs) -> Future:
+        """
+        Ejecuta una tarea en el ejecutor compartido sin bloquear la interfaz.
+        
+        El Future se sondea con root.after(), de modo que on_done siempre
+        se ejecuta en el hilo de Tk y puede actualizar widgets directamente.
+        
+        Args:
+            task: Función a ejecutar en segundo plano
+            on_done: Callback que recibe el Future terminado
+            *args, **kwargs: Argumentos para la tarea
+            
+        Returns:
+            Future de la tarea enviada
+        """
+        future = _get_executor().submit(task, *args, **kwargs)
+        self._poll_future(future, on_done)
+        return future
+    
+    def run_process_task(self, method: Callable, on_done: Callable[[Future], None],
+                         *args, **kwargs) -> Future:
+        """
+        Ejecuta un método de procesador en el proceso trabajador.
+        
+        Solo viajan la clase del procesador, el nombre del método y los
+        argumentos (que deben poder serializarse con pickle); el método se
+        invoca sobre una instancia propia del proceso trabajador.
+        
+        Args:
+            method: Método ligado de un procesador (p. ej. self.processor.x)
+            on_done: Callback que recibe el Future terminado
+            *args, **kwargs: Argumentos para el método
+            
+        Returns:
+            Future de la tarea enviada
+        """
+        future = _get_process_pool().submit(_run_processor_method, type(method.__self__),
+                                            method.__name__, *args, **kwargs)
+        self._poll_future(future, on_done)
+        return future
+    
+    def _poll_future(self, future: Future, on_done: Callable[[Future], None]):
+        """Revisa si la tarea terminó y entrega el resultado en el hilo de Tk."""
+        try:
+            if not self.root.winfo_exists():
+                return  # La ventana se cerró; se descarta el resultado
+        except tk.TclError:
+            return
+        
+        if future.done():
+            on_done(future)
+        else:
+            self.root.after(_POLL_INTERVAL_MS, self._poll_future, future, on_done)
     
     def set_close_callback(self, callback: Callable):
         """Establece callback para cerrar ventana."""
@@ -305,15 +595,24 @@ class BaseWindow:
         if self.on_close_callback:
             self.on_close_callback()
         else:
-            self.root.destroy()
+            self.close()
     
     def show(self):
         """Muestra la ventana."""
-        self.root.mainloop()
+        if self.parent is None:
+            self.root.mainloop()
+        else:
+            # Ventana secundaria: el mainloop de la ventana principal ya está activo
+            self.root.deiconify()
+            self.root.lift()
+            self.root.focus_force()
     
     def close(self):
-        """Cierra la ventana."""
-        self.root.destroy()
+        """Cierra la ventana (solo la oculta si es reutilizable)."""
+        if self.reusable:
+            self.root.withdraw()
+        else:
+            self.root.destroy()
     
     def configure_grid_weights(self):
         """Configura pesos de las columnas del grid."""
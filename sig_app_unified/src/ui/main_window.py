@@ -5,27 +5,69 @@ Menú central interactivo con diseño moderno en tono naranja.
 """
 
 import tkinter as tk
-from tkinter import messagebox
 import sys
 import os
+import time
 
 # Agregar el directorio src al path para importaciones
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.config import UI_COLORS, UI_FONTS, logger
-from src.pages.kmz_extractor_page import KMZExtractorPage
-from src.pages.excel_to_kmz_page import ExcelToKMZPage
-from src.pages.gpx_converter_page import GPXConverterPage
-from src.pages.buffer_generator_page import BufferGeneratorPage
+from src.ui.base_window import (register_hover_bindings, add_hover_effect, get_screen_size,
+                                shutdown_process_pool)
+
+# Las páginas se importan al abrirlas por primera vez: cargan pandas,
+# geopandas y los procesadores, que no se necesitan para mostrar el menú
 
 class MainWindow:
     """Ventana principal con menú interactivo."""
     
+    # Configuración de botones del menú (estática); "command" es el nombre
+    # del método que abre cada página
+    MENU_BUTTONS = (
+        {
+            "text": "Extraer Coordenadas\nKMZ → Excel",
+            "description": "Extrae coordenadas de archivos KMZ\ny las exporta a Excel",
+            "command": "_open_kmz_extractor",
+            "row": 0, "column": 0
+        },
+        {
+            "text": "Crear KMZ\nExcel → KMZ",
+            "description": "Crea archivos KMZ desde\ndatos de coordenadas en Excel",
+            "command": "_open_excel_to_kmz",
+            "row": 0, "column": 1
+        },
+        {
+            "text": "Convertir GPX\nGPX → KMZ",
+            "description": "Convierte archivos GPX\na formato KMZ",
+            "command": "_open_gpx_converter",
+            "row": 1, "column": 0
+        },
+        {
+            "text": "Generar Buffers\nKMZ + Buffer",
+            "description": "Aplica buffers a geometrías\nen archivos KMZ",
+            "command": "_open_buffer_generator",
+            "row": 1, "column": 1
+        }
+    )
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Fast SIG Arcadis")
         self.root.configure(bg=UI_COLORS["bg_primary"])
         self.root.resizable(False, False)
+        register_hover_bindings(self.root)
+        self._setup_styles()
+        
+        # Páginas ya construidas, reutilizadas al volver a abrirlas
+        self._pages = {}
+        
+        # Errores no fatales: se acumulan y se consultan desde un indicador
+        # en lugar de abrir un diálogo modal por cada uno
+        self._error_log = []
+        self._error_badge = None
+        self._error_window = None
+        self._error_text = None
         
         # Configurar tamaño y posición
         self._setup_window()
@@ -43,14 +85,34 @@ class MainWindow:
         width = 700
         height = 600
         
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
+        screen_width, screen_height = get_screen_size(self.root)
         
         x = (screen_width - width) // 2
         y = (screen_height - height) // 2
         
         self.root.geometry(f"{width}x{height}+{x}+{y}")
     
+    def _setup_styles(self):
+        """Configura los estilos ttk de las tarjetas del menú."""
+        from tkinter import ttk
+        
+        # Mismo tema que las páginas: los estilos se guardan por tema
+        self.style = ttk.Style(self.root)
+        self.style.theme_use('clam')
+        
+        # El hover solo cambia de estilo (Hover.MenuCard hereda de MenuCard)
+        self.style.configure(
+            "MenuCard.TFrame",
+            background=UI_COLORS["bg_secondary"],
+            borderwidth=1,
+            relief="solid"
+        )
+        self.style.configure(
+            "Hover.MenuCard.TFrame",
+            background=UI_COLORS["accent_primary"],
+            borderwidth=2
+        )
+    
     def _create_interface(self):
         """Crea la interfaz principal."""
         # Frame principal
@@ -105,50 +167,21 @@ class MainWindow:
     def _create_menu_buttons(self, parent):
         """Crea los botones del menú principal."""
         
-        # Configuración de botones
-        buttons_config = [
-            {
-                "text": "Extraer Coordenadas\nKMZ → Excel",
-                "description": "Extrae coordenadas de archivos KMZ\ny las exporta a Excel",
-                "command": self._open_kmz_extractor,
-                "row": 0, "column": 0
-            },
-            {
-                "text": "Crear KMZ\nExcel → KMZ",
-                "description": "Crea archivos KMZ desde\ndatos de coordenadas en Excel",
-                "command": self._open_excel_to_kmz,
-                "row": 0, "column": 1
-            },
-            {
-                "text": "Convertir GPX\nGPX → KMZ",
-                "description": "Convierte archivos GPX\na formato KMZ",
-                "command": self._open_gpx_converter,
-                "row": 1, "column": 0
-            },
-            {
-                "text": "Generar Buffers\nKMZ + Buffer",
-                "description": "Aplica buffers a geometrías\nen archivos KMZ",
-                "command": self._open_buffer_generator,
-                "row": 1, "column": 1
-            }
-        ]
+        # Configurar peso del grid (una vez por fila, no por botón)
+        for row in {config["row"] for config in self.MENU_BUTTONS}:
+            parent.grid_rowconfigure(row, weight=1)
         
         # Crear botones
-        for config in buttons_config:
+        for config in self.MENU_BUTTONS:
             self._create_menu_button(parent, config)
     
     def _create_menu_button(self, parent, config):
         """Crea un botón individual del menú."""
         
         # Frame contenedor para el botón
-        button_frame = tk.Frame(
-            parent,
-            bg=UI_COLORS["bg_secondary"],
-            relief="solid",
-            bd=1,
-            padx=20,
-            pady=20
-        )
+        from tkinter import ttk
+        
+        button_frame = ttk.Frame(parent, style="MenuCard.TFrame", padding=20)
         button_frame.grid(
             row=config["row"], 
             column=config["column"], 
@@ -159,14 +192,11 @@ class MainWindow:
             ipady=10
         )
         
-        # Configurar peso del grid
-        parent.grid_rowconfigure(config["row"], weight=1)
-        
         # Botón principal
         main_button = tk.Button(
             button_frame,
             text=config["text"],
-            command=config["command"],
+            command=getattr(self, config["command"]),
             bg=UI_COLORS["accent_primary"],
             fg="white",
             font=("Helvetica", 14, "bold"),
@@ -176,7 +206,9 @@ class MainWindow:
             pady=15,
             cursor="hand2",
             width=15,
-            height=3
+            height=3,
+            activebackground=UI_COLORS["accent_hover"],
+            activeforeground="white"
         )
         main_button.pack(pady=(0, 10))
         
@@ -191,66 +223,114 @@ class MainWindow:
         )
         desc_label.pack()
         
-        # Efectos hover para el botón
-        self._add_hover_effects(main_button, button_frame)
+        # Efectos hover compartidos por el botón y su frame
+        add_hover_effect([
+            (main_button, {"bg": UI_COLORS["accent_hover"]}, {"bg": UI_COLORS["accent_primary"]}),
+            (button_frame, {"style": "Hover.MenuCard.TFrame"}, {"style": "MenuCard.TFrame"})
+        ])
     
-    def _add_hover_effects(self, button, frame):
-        """Agrega efectos hover a un botón del menú."""
+    def _show_page(self, key: str, page_class):
+        """
+        Muestra una página, construyéndola solo la primera vez.
         
-        def on_enter(e):
-            button.configure(bg=UI_COLORS["accent_hover"])
-            frame.configure(bg=UI_COLORS["accent_primary"], bd=2)
-        
-        def on_leave(e):
-            button.configure(bg=UI_COLORS["accent_primary"])
-            frame.configure(bg=UI_COLORS["bg_secondary"], bd=1)
-        
-        # Aplicar efectos tanto al botón como al frame
-        for widget in [button, frame]:
-            widget.bind("<Enter>", on_enter)
-            widget.bind("<Leave>", on_leave)
+        Args:
+            key: Identificador de la página en la caché
+            page_class: Clase de la página a construir
+        """
+        page = self._pages.get(key)
+        if page is None or not page.root.winfo_exists():
+            page = page_class(self.root)
+            page.reusable = True
+            self._pages[key] = page
+        page.show()
     
     def _open_kmz_extractor(self):
         """Abre la página de extracción de coordenadas KMZ."""
         try:
-            page = KMZExtractorPage(self.root)
-            page.show()
+            from src.pages.kmz_extractor_page import KMZExtractorPage
+            self._show_page("kmz_extractor", KMZExtractorPage)
         except Exception as e:
             logger.error(f"Error abriendo extractor KMZ: {e}")
-            messagebox.showerror("Error", f"No se pudo abrir el extractor KMZ:\n{e}")
+            self._report_error("No se pudo abrir el extractor KMZ", e)
     
     def _open_excel_to_kmz(self):
         """Abre la página de conversión Excel a KMZ."""
         try:
-            page = ExcelToKMZPage(self.root)
-            page.show()
+            from src.pages.excel_to_kmz_page import ExcelToKMZPage
+            self._show_page("excel_to_kmz", ExcelToKMZPage)
         except Exception as e:
             logger.error(f"Error abriendo conversor Excel a KMZ: {e}")
-            messagebox.showerror("Error", f"No se pudo abrir el conversor Excel a KMZ:\n{e}")
+            self._report_error("No se pudo abrir el conversor Excel a KMZ", e)
     
     def _open_gpx_converter(self):
         """Abre la página de conversión GPX."""
         try:
-            page = GPXConverterPage(self.root)
-            page.show()
+            from src.pages.gpx_converter_page import GPXConverterPage
+            self._show_page("gpx_converter", GPXConverterPage)
         except Exception as e:
             logger.error(f"Error abriendo conversor GPX: {e}")
-            messagebox.showerror("Error", f"No se pudo abrir el conversor GPX:\n{e}")
+            self._report_error("No se pudo abrir el conversor GPX", e)
     
     def _open_buffer_generator(self):
         """Abre la página de generación de buffers."""
         try:
-            page = BufferGeneratorPage(self.root)
-            page.show()
+            from src.pages.buffer_generator_page import BufferGeneratorPage
+            self._show_page("buffer_generator", BufferGeneratorPage)
         except Exception as e:
             logger.error(f"Error abriendo generador de buffers: {e}")
-            messagebox.showerror("Error", f"No se pudo abrir el generador de buffers:\n{e}")
+            self._report_error("No se pudo abrir el generador de buffers", e)
+    
+    def _report_error(self, where: str, exc: Exception):
+        """
+        Registra un error no fatal y actualiza el indicador de errores.
+        
+        Args:
+            where: Descripción de la operación que falló
+            exc: Excepción capturada
+        """
+        self._error_log.append((time.time(), where, str(exc)))
+        
+        if self._error_badge is None:
+            self._error_badge = tk.Label(
+                self.root,
+                font=UI_FONTS["small"],
+                bg=UI_COLORS["error"],
+                fg="white",
+                padx=8,
+                pady=2,
+                cursor="hand2"
+            )
+            self._error_badge.place(relx=1.0, rely=0.0, x=-10, y=10, anchor="ne")
+            self._error_badge.bind("<Button-1>", lambda e: self._show_error_log())
+        self._error_badge.configure(text=f"! {len(self._error_log)}")
+    
+    def _show_error_log(self):
+        """Muestra el detalle de los errores registrados."""
+        if self._error_window is None or not self._error_window.winfo_exists():
+            self._error_window = tk.Toplevel(self.root)
+            self._error_window.title("Errores")
+            self._error_window.protocol("WM_DELETE_WINDOW", self._error_window.withdraw)
+            self._error_text = tk.Text(self._error_window, width=70, height=15,
+                                       font=UI_FONTS["small"], wrap="word")
+            self._error_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        lines = [f"[{time.strftime('%H:%M:%S', time.localtime(timestamp))}] {where}: {message}"
+                 for timestamp, where, message in self._error_log]
+        self._error_text.configure(state="normal")
+        self._error_text.delete("1.0", tk.END)
+        self._error_text.insert("1.0", "\n".join(lines))
+        self._error_text.configure(state="disabled")
+        
+        self._error_window.deiconify()
+        self._error_window.lift()
     
     def _on_close(self):
         """Maneja el cierre de la aplicación."""
+        from tkinter import messagebox
         if messagebox.askokcancel("Salir", "¿Está seguro que desea salir de la aplicación?"):
             logger.info("Aplicación SIG cerrada")
             self.root.destroy()
+            shutdown_process_pool()
     
     def run(self):
         """Ejecuta la aplicación."""
@@ -263,6 +343,7 @@ def main():
         app.run()
     except Exception as e:
         logger.error(f"Error fatal en la aplicación: {e}")
+        from tkinter import messagebox
         messagebox.showerror("Error Fatal", f"Error iniciando la aplicación:\n{e}")
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+
+"""
+Tests para el proceso trabajador de la ventana base.
+"""
+
+import pytest
+import os
+import tempfile
+import zipfile
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ui.base_window import _get_process_pool, _run_processor_method, shutdown_process_pool
+from src.core.kmz_processor import KMZProcessor
+from src.core.validators import ValidationError
+
+class TestProcessPool:
+    """Tests para las tareas ejecutadas en el proceso trabajador."""
+    
+    def setup_method(self):
+        """Configuración para cada test."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def teardown_method(self):
+        """Limpieza después de cada test."""
+        shutdown_process_pool()
+    
+    def _run_in_worker(self, method_name: str, *args):
+        """Ejecuta un método de KMZProcessor en el proceso trabajador."""
+        future = _get_process_pool().submit(_run_processor_method, KMZProcessor, method_name, *args)
+        return future.result(timeout=60)
+    
+    def test_malformed_kmz_reports_parse_error(self):
+        """Test que un error de parseo llega a la interfaz con su mensaje."""
+        kmz_path = os.path.join(self.temp_dir, 'malformed.kmz')
+        with zipfile.ZipFile(kmz_path, 'w') as kmz:
+            kmz.writestr('doc.kml', '<kml><Placemark><name>A</Placemark></kml>')
+        
+        with pytest.raises(RuntimeError) as excinfo:
+            self._run_in_worker("extract_coordinates_to_excel", kmz_path,
+                                os.path.join(self.temp_dir, 'out.xlsx'))
+        
+        assert "pickle" not in str(excinfo.value)
+        assert "Placemark" in str(excinfo.value)
+    
+    def test_validation_error_passes_through(self):
+        """Test que ValidationError llega sin convertirse."""
+        kmz_path = os.path.join(self.temp_dir, 'empty.kmz')
+        with zipfile.ZipFile(kmz_path, 'w') as kmz:
+            kmz.writestr('doc.kml', '<kml xmlns="http://www.opengis.net/kml/2.2"><Document/></kml>')
+        
+        with pytest.raises(ValidationError, match="No se encontraron coordenadas"):
+            self._run_in_worker("extract_coordinates_to_excel", kmz_path,
+                                os.path.join(self.temp_dir, 'out.xlsx'))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -6,11 +6,14 @@ Tests para el procesador de archivos GPX.
 import pytest
 import tempfile
 import os
+import numpy as np
 
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from core.gpx_processor import GPXProcessor
+import core.gpx_processor as gpx_module
+from core.gpx_processor import (GPXProcessor, load_gpx, parse_gpx_stream, gpx_has_items,
+                                _polyline_length)
 
 class TestGPXProcessor:
     """Tests para GPXProcessor."""
@@ -55,6 +58,131 @@ class TestGPXProcessor:
         # Verificar que se limpió
         assert not os.path.exists(temp_test_dir)
         assert len(self.processor.temp_dirs) == 0
+    
+    def test_context_manager_cleans_temp_dirs(self):
+        """Test de limpieza al salir del bloque with."""
+        with GPXProcessor() as processor:
+            temp_test_dir = tempfile.mkdtemp()
+            processor.temp_dirs.append(temp_test_dir)
+        
+        assert not os.path.exists(temp_test_dir)
+        assert len(processor.temp_dirs) == 0
+    
+    def test_convert_gpx_to_kmz(self):
+        """Test de conversión GPX a KMZ con estilos compartidos."""
+        import zipfile
+        
+        gpx_path = os.path.join(self.temp_dir, "test.gpx")
+        with open(gpx_path, 'w', encoding='utf-8') as f:
+            f.write(
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">'
+                '<wpt lat="-33.45" lon="-70.66"><name>WP1</name></wpt>'
+                '<trk><name>Track</name><trkseg>'
+                '<trkpt lat="-33.45" lon="-70.66"><ele>500</ele></trkpt>'
+                '<trkpt lat="-33.46" lon="-70.67"></trkpt>'
+                '</trkseg></trk>'
+                '</gpx>'
+            )
+        
+        output_path = os.path.join(self.temp_dir, "test.kmz")
+        assert self.processor.convert_gpx_to_kmz(gpx_path, output_path)
+        
+        with zipfile.ZipFile(output_path) as kmz:
+            kml = kmz.read(kmz.namelist()[0]).decode('utf-8')
+        
+        assert kml.count('<Placemark>') == 2
+        assert kml.count('<Style ') == 2
+        assert '-70.66,-33.45,500.0 -70.67,-33.46,0.0' in kml
+        
+        # La distancia del track se calcula una vez y se comparte con get_gpx_info
+        info = self.processor.get_gpx_info(gpx_path)
+        assert info["total_distance"] > 0
+        assert f"Distancia: {info['total_distance'] / 1000:.2f} km" in kml
+    
+    def test_gpx_parsed_once_per_version(self):
+        """Test que get_gpx_info y la conversión comparten el GPX parseado."""
+        gpx_path = os.path.join(self.temp_dir, "cache.gpx")
+        with open(gpx_path, 'w', encoding='utf-8') as f:
+            f.write('<gpx version="1.1" creator="test"><wpt lat="-33.45" lon="-70.66"/></gpx>')
+        
+        first = load_gpx(gpx_path)
+        assert load_gpx(gpx_path) is first
+        assert self.processor.get_gpx_info(gpx_path)["waypoints"] == 1
+        
+        # Modificar el archivo invalida la caché
+        with open(gpx_path, 'w', encoding='utf-8') as f:
+            f.write('<gpx version="1.1" creator="test"><wpt lat="-33.45" lon="-70.66"/>'
+                    '<wpt lat="-33.46" lon="-70.67"/></gpx>')
+        
+        assert load_gpx(gpx_path) is not first
+        assert self.processor.get_gpx_info(gpx_path)["waypoints"] == 2
+    
+    def test_parse_gpx_stream(self, monkeypatch):
+        """Test del parser en streaming con lxml y con ElementTree."""
+        gpx_path = os.path.join(self.temp_dir, "stream.gpx")
+        with open(gpx_path, 'w', encoding='utf-8') as f:
+            f.write(
+                '<gpx version="1.0" xmlns="http://www.topografix.com/GPX/1/0">'
+                '<metadata><name>Meta</name></metadata>'
+                '<wpt lat="-33.45" lon="-70.66"><ele>12.5</ele><name>WP &amp; 1</name>'
+                '<cmt>nota</cmt></wpt>'
+                '<trk><name>Track</name><desc>Desc</desc>'
+                '<trkseg><trkpt lat="-33.45" lon="-70.66"><ele>500</ele></trkpt>'
+                '<trkpt lat="-33.46" lon="-70.67"/></trkseg><trkseg/></trk>'
+                '<rte><rtept lat="-33.0" lon="-70.0"/></rte>'
+                '</gpx>'
+            )
+        
+        results = [parse_gpx_stream(gpx_path)]
+        import xml.etree.ElementTree as StdET
+        monkeypatch.setattr(gpx_module, "HAS_LXML", False)
+        monkeypatch.setattr(gpx_module, "ET", StdET)
+        results.append(parse_gpx_stream(gpx_path))
+        
+        for gpx in results:
+            waypoint = gpx.waypoints[0]
+            assert (waypoint.name, waypoint.comment, waypoint.elevation) == ("WP & 1", "nota", 12.5)
+            track = gpx.tracks[0]
+            assert (track.name, track.description) == ("Track", "Desc")
+            np.testing.assert_array_equal(
+                track.segments[0], [[-70.66, -33.45, 500.0], [-70.67, -33.46, np.nan]])
+            assert track.segments[1].shape == (0, 3)
+            assert gpx.routes[0].name is None
+            np.testing.assert_array_equal(gpx.routes[0].points, [[-70.0, -33.0, np.nan]])
+    
+    def test_polyline_length_matches_gpxpy(self):
+        """Test que la longitud con haversine coincide con length_3d de gpxpy."""
+        gpxpy_gpx = pytest.importorskip("gpxpy.gpx")
+        rng = np.random.default_rng(0)
+        points = np.column_stack([
+            -70 + np.cumsum(rng.normal(0, 1e-3, 200)),
+            -33 + np.cumsum(rng.normal(0, 1e-3, 200)),
+            rng.uniform(0, 1000, 200)
+        ])
+        points[10, 1] += 0.5  # tramos lejanos: haversine
+        points[20:30, 2] = np.nan  # sin elevación: distancia 2D
+        
+        segment = gpxpy_gpx.GPXTrackSegment([
+            gpxpy_gpx.GPXTrackPoint(lat, lon, elevation=None if np.isnan(ele) else ele)
+            for lon, lat, ele in points
+        ])
+        # gpxpy usa una aproximación plana para tramos cortos; haversine difiere
+        # en fracciones de milímetro por tramo
+        assert _polyline_length(points) == pytest.approx(segment.length_3d(), rel=1e-5)
+    
+    def test_gpx_has_items(self):
+        """Test de la verificación rápida de contenido del GPX."""
+        empty_path = os.path.join(self.temp_dir, "empty.gpx")
+        with open(empty_path, 'w', encoding='utf-8') as f:
+            f.write('<gpx version="1.1"><metadata><name>Vacío</name></metadata></gpx>')
+        assert not gpx_has_items(empty_path)
+        
+        # Se detiene en el primer elemento, aunque el resto esté incompleto
+        partial_path = os.path.join(self.temp_dir, "partial.gpx")
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            f.write('<gpx version="1.1"><wpt lat="-33.45" lon="-70.66"/>' + '<trk>' * 10)
+        assert gpx_has_items(partial_path)
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,62 @@
+
+"""
+Tests para el escritor de KML.
+"""
+
+import pytest
+import os
+import xml.etree.ElementTree as ET
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.kml_writer import KMLWriter, KML_NAMESPACE
+
+class TestKMLWriter:
+    """Tests para KMLWriter."""
+    
+    def setup_method(self):
+        """Configuración para cada test."""
+        self.names = ["A & B", "<C>", "D"]
+        self.descriptions = ["uno", "", "tres"]
+        self.coords = [(-70.5, -33.4), (-71.0, -32.0, 15.5), (-72.25, -34.0)]
+    
+    def test_add_points_matches_add_point(self):
+        """Test que el armado por lotes genera el mismo KML que punto a punto."""
+        single = KMLWriter()
+        style_single = single.icon_style("icono.png", 1.2)
+        folder = single.new_folder("Puntos")
+        for name, description, coord in zip(self.names, self.descriptions, self.coords):
+            single.add_point(folder, name, coord, description=description, style_id=style_single)
+        
+        batch = KMLWriter()
+        style_batch = batch.icon_style("icono.png", 1.2)
+        folder = batch.new_folder("Puntos")
+        batch.add_points(folder, self.names, self.coords, self.descriptions, style_id=style_batch)
+        
+        assert batch.to_bytes() == single.to_bytes()
+    
+    def test_add_points_is_valid_kml(self):
+        """Test que el fragmento insertado produce un documento válido."""
+        kml = KMLWriter()
+        kml.add_points(None, self.names, self.coords)
+        kml.add_point(None, "Final", (-73.0, -35.0))
+        
+        root = ET.fromstring(kml.to_bytes())
+        ns = {"kml": KML_NAMESPACE}
+        names = [elem.text for elem in root.iterfind(".//kml:Placemark/kml:name", ns)]
+        assert names == self.names + ["Final"]
+        assert root.find(".//kml:description", ns) is None
+    
+    def test_format_coordinates_array_matches_list(self):
+        """Test que formatear un arreglo NumPy da el mismo texto que una lista."""
+        coords = np.array([[-70.66, -33.45, 500.0], [-70.123456789, -33.1, 0.0], [1e-7, 1e16, -0.0]])
+        
+        text = KMLWriter.format_coordinates(coords)
+        assert text == KMLWriter.format_coordinates(coords.tolist())
+        assert text.startswith("-70.66,-33.45,500.0 ")
+        assert KMLWriter.format_coordinates(np.empty((0, 3))) == ""
+
+if __name__ == "__main__":
+    pytest.main([__file__])
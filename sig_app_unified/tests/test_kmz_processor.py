@@ -6,6 +6,7 @@ Tests para el procesador de archivos KMZ.
 import pytest
 import tempfile
 import os
+import zipfile
 import pandas as pd
 import geopandas as gpd
 from shapely.geometry import Point
@@ -13,6 +14,7 @@ from shapely.geometry import Point
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import core.kmz_processor as kmz_module
 from core.kmz_processor import KMZProcessor
 from core.validators import ValidationError
 
@@ -62,6 +64,150 @@ class TestKMZProcessor:
         assert result is True
         assert os.path.exists(kmz_path)
     
+    def test_extract_coordinates_roundtrip(self):
+        """Test de extracción de coordenadas desde un KMZ generado."""
+        df = pd.DataFrame({
+            'nombre': ['Punto 1', 'Punto 2'],
+            'este': [300000, 301000],
+            'norte': [7500000, 7501000],
+            'descripcion': ['Desc 1', 'Desc 2']
+        })
+        excel_path = os.path.join(self.temp_dir, 'roundtrip.xlsx')
+        df.to_excel(excel_path, index=False)
+        
+        kmz_path = os.path.join(self.temp_dir, 'roundtrip.kmz')
+        self.processor.create_kmz_from_excel(excel_path, kmz_path)
+        
+        output_path = os.path.join(self.temp_dir, 'roundtrip_out.xlsx')
+        result = self.processor.extract_coordinates_to_excel(kmz_path, output_path)
+        
+        assert result is True
+        out = pd.read_excel(output_path)
+        assert list(out["Nombre del Punto"]) == ['Punto 1', 'Punto 2']
+        assert out["Este"].tolist() == pytest.approx([300000, 301000], abs=0.01)
+        assert out["Norte"].tolist() == pytest.approx([7500000, 7501000], abs=0.01)
+    
+    def test_extract_coordinates_auto_crs(self):
+        """Test de extracción con detección automática de zona UTM."""
+        df = pd.DataFrame({
+            'nombre': ['Punto 1'],
+            'este': [300000],
+            'norte': [7500000]
+        })
+        excel_path = os.path.join(self.temp_dir, 'auto.xlsx')
+        df.to_excel(excel_path, index=False)
+        
+        kmz_path = os.path.join(self.temp_dir, 'auto.kmz')
+        self.processor.create_kmz_from_excel(excel_path, kmz_path)
+        
+        output_path = os.path.join(self.temp_dir, 'auto_out.xlsx')
+        assert self.processor.extract_coordinates_to_excel(kmz_path, output_path, "auto")
+        
+        out = pd.read_excel(output_path)
+        assert out["Este"].tolist() == pytest.approx([300000], abs=0.01)
+    
+    def test_extract_coordinates_skips_unprojectable_points(self):
+        """Test que los puntos que no se pueden proyectar se omiten."""
+        from core.kml_writer import KMLWriter
+        from core.utils import write_kmz
+        
+        kml = KMLWriter()
+        kml.add_point(None, "Valido", (-70.0, -33.0))
+        kml.add_point(None, "Invalido", (-70.0, 95.0))
+        kmz_path = os.path.join(self.temp_dir, 'invalid.kmz')
+        write_kmz(kml.to_bytes(), kmz_path)
+        
+        output_path = os.path.join(self.temp_dir, 'invalid_out.xlsx')
+        assert self.processor.extract_coordinates_to_excel(kmz_path, output_path)
+        
+        out = pd.read_excel(output_path)
+        assert list(out["Nombre del Punto"]) == ['Valido']
+    
+    def test_parse_coordinate_texts(self):
+        """Test de conversión en lote de textos de coordenadas."""
+        lons, lats = self.processor._parse_coordinate_texts([" -70.1,-33.2,0 ", "-70,-33", "-71"])
+        assert lons[:2].tolist() == [-70.1, -70.0]
+        assert lats[:2].tolist() == [-33.2, -33.0]
+        assert pd.isna(lats[2])
+        
+        # Un texto mal formado activa la interpretación uno por uno
+        lons, lats = self.processor._parse_coordinate_texts(["-70.1, -33.2", "x,1", "1,2 3,4"])
+        assert lons[0] == -70.1 and lats[0] == -33.2
+        assert pd.isna(lons[1])
+        assert (lons[2], lats[2]) == (1.0, 2.0)
+    
+    def test_extract_coordinates_stdlib_matches_lxml(self, monkeypatch):
+        """Test que el parser de respaldo (ElementTree) coincide con lxml."""
+        pytest.importorskip("lxml")
+        kml = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>'
+            '<Placemark><name>A</name><description>uno</description>'
+            '<Point><coordinates>-70.5,-33.4,0</coordinates></Point></Placemark>'
+            '<Placemark><name>Linea</name>'
+            '<LineString><coordinates>-70,-33 -71,-34</coordinates></LineString></Placemark>'
+            '<Placemark><Point><coordinates> -71.25,-32.75 </coordinates></Point></Placemark>'
+            '</Folder></Document></kml>'
+        )
+        kmz_path = os.path.join(self.temp_dir, 'parsers.kmz')
+        with zipfile.ZipFile(kmz_path, 'w') as kmz:
+            kmz.writestr('doc.kml', kml)
+        
+        with_lxml = self.processor._extract_coordinates_from_kmz(kmz_path)
+        
+        import xml.etree.ElementTree as StdET
+        monkeypatch.setattr(kmz_module, "HAS_LXML", False)
+        monkeypatch.setattr(kmz_module, "ET", StdET)
+        with_stdlib = self.processor._extract_coordinates_from_kmz(kmz_path)
+        
+        assert with_lxml == with_stdlib == [
+            ('A', 'uno', -70.5, -33.4),
+            ('Sin Nombre', '', -71.25, -32.75)
+        ]
+    
+    def test_write_excel_rows_keeps_strings(self):
+        """Test de escritura en streaming con xlsxwriter."""
+        pytest.importorskip("xlsxwriter")
+        import numpy as np
+        excel_path = os.path.join(self.temp_dir, 'rows.xlsx')
+        self.processor._write_excel_rows(excel_path, {
+            "Nombre del Punto": np.array(["123", "http://ejemplo.cl", None], dtype=object),
+            "Este": np.array([1.5, 2.0, 3.25])
+        })
+        
+        df = pd.read_excel(excel_path, dtype={"Nombre del Punto": str})
+        assert list(df.columns) == ["Nombre del Punto", "Este"]
+        assert df["Nombre del Punto"].tolist()[:2] == ["123", "http://ejemplo.cl"]
+        assert pd.isna(df["Nombre del Punto"].iloc[2])
+        assert df["Este"].tolist() == [1.5, 2.0, 3.25]
+    
+    def test_create_kmz_skips_non_numeric_rows(self):
+        """Test que las filas con coordenadas no numéricas se omiten."""
+        df = pd.DataFrame({
+            'nombre': ['Punto 1', 'Punto 2'],
+            'este': [300000, 'sin dato'],
+            'norte': [7500000, 7501000]
+        })
+        excel_path = os.path.join(self.temp_dir, 'mixed.xlsx')
+        df.to_excel(excel_path, index=False)
+        
+        kmz_path = os.path.join(self.temp_dir, 'mixed.kmz')
+        assert self.processor.create_kmz_from_excel(excel_path, kmz_path)
+        
+        coordinates = self.processor._extract_coordinates_from_kmz(kmz_path)
+        assert [name for name, _, _, _ in coordinates] == ['Punto 1']
+    
+    def test_read_excel_falls_back_to_default_engine(self, monkeypatch):
+        """Test que un motor de lectura no soportado cae al motor por defecto."""
+        excel_path = os.path.join(self.temp_dir, 'fallback.xlsx')
+        pd.DataFrame({'nombre': ['A', 'B'], 'este': [1.0, 2.0]}).to_excel(excel_path, index=False)
+        
+        monkeypatch.setattr(kmz_module, "EXCEL_READ_ENGINE", "motor-inexistente")
+        df = kmz_module.read_excel(excel_path, usecols=['este'])
+        
+        assert list(df.columns) == ['este']
+        assert df['este'].tolist() == [1.0, 2.0]
+    
     def test_create_kmz_missing_columns(self):
         """Test con columnas faltantes."""
         # Crear Excel sin columna requerida
@@ -88,6 +234,36 @@ class TestKMZProcessor:
         assert hasattr(self.processor, 'apply_buffer_to_kmz')
         assert callable(self.processor.apply_buffer_to_kmz)
     
+    def test_apply_buffer_reuses_utm_crs(self):
+        """Test de buffer sobre un KMZ real con CRS UTM en caché."""
+        df = pd.DataFrame({
+            'nombre': ['Punto 1', 'Punto 2'],
+            'este': [300000, 301000],
+            'norte': [7500000, 7501000]
+        })
+        excel_path = os.path.join(self.temp_dir, 'buffer.xlsx')
+        df.to_excel(excel_path, index=False)
+        
+        kmz_path = os.path.join(self.temp_dir, 'buffer.kmz')
+        self.processor.create_kmz_from_excel(excel_path, kmz_path)
+        
+        for combine in (False, True):
+            output_path = os.path.join(self.temp_dir, f'buffer_{combine}.kmz')
+            assert self.processor.apply_buffer_to_kmz(kmz_path, output_path, 100, combine)
+            
+            with zipfile.ZipFile(output_path) as kmz:
+                kml = kmz.read(kmz.namelist()[0]).decode('utf-8')
+            assert kml.count('<Placemark>') == (1 if combine else 4)
+            assert kml.count('<Polygon>') == 2
+            
+            # Las geometrías originales se conservan sin reproyectar
+            if not combine:
+                original = self.processor._extract_coordinates_from_kmz(kmz_path)
+                assert self.processor._extract_coordinates_from_kmz(output_path) == original
+        
+        assert len(self.processor._utm_crs_cache) == 1
+        assert next(iter(self.processor._utm_crs_cache.values())).to_epsg() == 32719
+    
     def test_cleanup_temp_dirs(self):
         """Test de limpieza de directorios temporales."""
         # Agregar directorio temporal
@@ -103,6 +279,15 @@ class TestKMZProcessor:
         # Verificar que se limpió
         assert not os.path.exists(temp_test_dir)
         assert len(self.processor.temp_dirs) == 0
+    
+    def test_context_manager_cleans_temp_dirs(self):
+        """Test de limpieza al salir del bloque with."""
+        with KMZProcessor() as processor:
+            temp_test_dir = tempfile.mkdtemp()
+            processor.temp_dirs.append(temp_test_dir)
+        
+        assert not os.path.exists(temp_test_dir)
+        assert len(processor.temp_dirs) == 0
 
 if __name__ == "__main__":
     pytest.main([__file__])
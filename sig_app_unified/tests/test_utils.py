@@ -0,0 +1,120 @@
+
+"""
+Tests para las utilidades compartidas.
+"""
+
+import pytest
+import os
+import numpy as np
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.utils import (estimate_utm_crs, get_crs, get_transformer,
+                        convert_coordinates, convert_coordinates_bulk, same_crs,
+                        available_cpus, transform_geometries, PARALLEL_TRANSFORM_CHUNK)
+
+class TestUTMEstimation:
+    """Tests para la estimación de zonas UTM."""
+    
+    def test_estimate_utm_crs_chile(self):
+        """Test de zona UTM para coordenadas en Chile."""
+        assert estimate_utm_crs(-70.6, -33.4) == "EPSG:32719"
+
+class TestCRSCache:
+    """Tests para la caché de CRS y Transformers."""
+    
+    def test_get_crs_is_cached(self):
+        """Test que el mismo código devuelve el mismo objeto CRS."""
+        assert get_crs("EPSG:32719") is get_crs("EPSG:32719")
+        assert get_crs("EPSG:32719").to_epsg() == 32719
+    
+    def test_convert_coordinates_accepts_crs_objects(self):
+        """Test que los CRS como objeto y como texto dan el mismo resultado."""
+        from_str = convert_coordinates(-70.6, -33.4, "EPSG:4326", "EPSG:32719")
+        from_obj = convert_coordinates(-70.6, -33.4, get_crs("EPSG:4326"), get_crs("EPSG:32719"))
+        assert from_str == pytest.approx(from_obj)
+        assert get_transformer("EPSG:4326", "EPSG:32719") is get_transformer("EPSG:4326", "EPSG:32719")
+    
+    def test_same_crs_skips_transform(self):
+        """Test que CRS equivalentes no se transforman."""
+        assert same_crs("EPSG:4326", "OGC:CRS84")
+        assert not same_crs("EPSG:4326", "EPSG:32719")
+        
+        xs, ys = convert_coordinates_bulk([-70.6], [-33.4], "EPSG:4326", get_crs("EPSG:4326"))
+        assert xs.tolist() == [-70.6] and ys.tolist() == [-33.4]
+    
+    def test_available_cpus(self):
+        """Test que la cantidad de CPUs disponibles es válida."""
+        assert 1 <= available_cpus() <= (os.cpu_count() or 1)
+    
+    def test_convert_coordinates_bulk_parallel_matches_serial(self, monkeypatch):
+        """Test que la reproyección por bloques coincide con la de una sola llamada."""
+        monkeypatch.setattr("core.utils.available_cpus", lambda: 4)
+        n = PARALLEL_TRANSFORM_CHUNK * 2 + 1
+        lons = np.linspace(-72.0, -66.0, n)
+        lats = np.linspace(-40.0, -18.0, n)
+        
+        xs, ys = convert_coordinates_bulk(lons, lats, "EPSG:4326", "EPSG:32719")
+        xs_ref, ys_ref = get_transformer("EPSG:4326", "EPSG:32719").transform(lons, lats)
+        
+        np.testing.assert_allclose(xs, xs_ref)
+        np.testing.assert_allclose(ys, ys_ref)
+    
+    def test_convert_coordinates_bulk_reuses_thread_transformers(self, monkeypatch):
+        """Test que los hilos de reproyección conservan sus Transformers entre llamadas."""
+        from concurrent.futures import ThreadPoolExecutor
+        from pyproj import Transformer
+        
+        monkeypatch.setattr("core.utils.available_cpus", lambda: 2)
+        monkeypatch.setattr("core.utils._TRANSFORM_EXECUTOR", ThreadPoolExecutor(max_workers=1))
+        
+        created = []
+        from_crs = Transformer.from_crs
+        def counting_from_crs(*args, **kwargs):
+            created.append(args)
+            return from_crs(*args, **kwargs)
+        monkeypatch.setattr(Transformer, "from_crs", counting_from_crs)
+        
+        n = PARALLEL_TRANSFORM_CHUNK * 2
+        lons = np.full(n, -70.6)
+        lats = np.full(n, -33.4)
+        convert_coordinates_bulk(lons, lats, "EPSG:4326", "EPSG:32718")
+        first = len(created)
+        convert_coordinates_bulk(lons, lats, "EPSG:4326", "EPSG:32718")
+        
+        assert first == 1
+        assert len(created) == first
+    
+    def test_transform_geometries_matches_to_crs(self):
+        """Test que la reproyección en bloque coincide con la de geopandas."""
+        gpd = pytest.importorskip("geopandas")
+        from shapely.geometry import LineString, Point, Polygon
+        
+        geoms = gpd.GeoSeries([
+            Point(-70.6, -33.4),
+            LineString([(-70.0, -33.0), (-70.5, -33.5), (-71.0, -33.2)]),
+            Polygon([(-71.0, -34.0), (-70.0, -34.0), (-70.0, -33.0), (-71.0, -34.0)]),
+        ], crs="EPSG:4326")
+        
+        result = transform_geometries(geoms.values, "EPSG:4326", "EPSG:32719")
+        expected = geoms.to_crs("EPSG:32719")
+        
+        for geom, ref in zip(result, expected):
+            assert geom.geom_type == ref.geom_type
+            assert geom.equals_exact(ref, 1e-6)
+    
+    def test_same_crs_skips_geometry_transform(self, monkeypatch):
+        """Test que no se llama a PROJ si origen y destino coinciden."""
+        from shapely.geometry import Point
+        
+        def fail(*args):
+            raise AssertionError("No debería crear un Transformer")
+        monkeypatch.setattr("core.utils.get_transformer", fail)
+        
+        geoms = np.array([Point(-70.6, -33.4)], dtype=object)
+        assert transform_geometries(geoms, "EPSG:4326", get_crs("EPSG:4326"))[0] is geoms[0]
+        assert convert_coordinates(-70.6, -33.4, "EPSG:4326", "EPSG:4326") == (-70.6, -33.4)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -7,6 +7,8 @@ import pytest
 import tempfile
 import os
 import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Point
 
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -31,6 +33,38 @@ class TestFileValidator:
         result = FileValidator.validate_excel_file(excel_path)
         assert result is True
     
+    def test_validate_excel_file_empty(self):
+        """Test de validación de archivo Excel solo con encabezados."""
+        df = pd.DataFrame({'col1': [], 'col2': []})
+        excel_path = os.path.join(self.temp_dir, 'empty.xlsx')
+        df.to_excel(excel_path, index=False)
+        
+        with pytest.raises(ValidationError):
+            FileValidator.validate_excel_file(excel_path)
+    
+    def test_validate_excel_file_missing_columns(self):
+        """Test de validación con columnas requeridas faltantes."""
+        df = pd.DataFrame({'col1': [1, 2, 3], 'col2': ['a', 'b', 'c']})
+        excel_path = os.path.join(self.temp_dir, 'test.xlsx')
+        df.to_excel(excel_path, index=False)
+        
+        assert FileValidator.validate_excel_file(excel_path, ['col1']) is True
+        with pytest.raises(ValidationError):
+            FileValidator.validate_excel_file(excel_path, ['col1', 'col3'])
+    
+    def test_validate_excel_file_reads_first_sheet(self):
+        """Test que se valida la primera hoja aunque otra esté seleccionada."""
+        import openpyxl
+        wb = openpyxl.Workbook()
+        wb.active.append(['col1', 'col2', 'col3'])
+        wb.active.append([1, 'a', 2.5])
+        wb.create_sheet('Vacia')
+        wb.active = 1
+        excel_path = os.path.join(self.temp_dir, 'second_active.xlsx')
+        wb.save(excel_path)
+        
+        assert FileValidator.validate_excel_file(excel_path, ['col1', 'col3']) is True
+    
     def test_validate_excel_file_not_exists(self):
         """Test de validación con archivo inexistente."""
         non_existent_path = os.path.join(self.temp_dir, 'no_existe.xlsx')
@@ -73,6 +107,16 @@ class TestDataValidator:
         with pytest.raises(ValidationError):
             DataValidator.validate_buffer_distance("200000")  # Muy grande
     
+    def test_parse_buffer_distance(self):
+        """Test de conversión de distancia sin excepciones."""
+        assert DataValidator.parse_buffer_distance("100") == (True, 100.0)
+        assert DataValidator.parse_buffer_distance("12,5") == (True, 12.5)
+        
+        for value in ("0", "abc", "nan", "200000"):
+            is_valid, message = DataValidator.parse_buffer_distance(value)
+            assert is_valid is False
+            assert isinstance(message, str)
+    
     def test_validate_coordinates_data_valid(self):
         """Test de validación de datos de coordenadas válidos."""
         df = pd.DataFrame({
@@ -93,6 +137,29 @@ class TestDataValidator:
         errors = DataValidator.validate_coordinates_data(df)
         assert len(errors) > 0
         assert any("norte" in error for error in errors)
+    
+    def test_validate_coordinates_data_invalid_rows(self):
+        """Test de validación con filas no numéricas y fuera de rango."""
+        df = pd.DataFrame({
+            'este': [300000, 'abc', 5000000, 302000],
+            'norte': [7500000, 7501000, 7502000, None]
+        })
+        
+        errors = DataValidator.validate_coordinates_data(df)
+        assert errors == [
+            "Fila 2: Coordenadas no numéricas",
+            "Fila 3: Coordenadas fuera de rango válido",
+            "Fila 4: Coordenadas no numéricas"
+        ]
+
+    def test_validate_geodataframe_issues(self):
+        """Test de validación de GeoDataFrame con geometrías faltantes y vacías."""
+        gdf = gpd.GeoDataFrame(geometry=[Point(0, 0), None, Point()])
+        
+        issues = DataValidator.validate_geodataframe(gdf)
+        assert "ADVERTENCIA: 1 geometrías inválidas" in issues
+        assert "ADVERTENCIA: 1 geometrías vacías" in issues
+        assert "ADVERTENCIA: Sin sistema de coordenadas definido" in issues
 
 class TestInputValidator:
     """Tests para InputValidator."""